@@ -399,6 +399,7 @@ class BatchedMACCosmeticsScraper:
         
         # Step 3: Scrape individual product pages
         scraped_products = []
+        batch_urls = []
         for i, product in enumerate(all_new_products):
             logger.info(f"Processing product {i+1}/{len(all_new_products)}: {product['name']}")
             
@@ -428,7 +429,7 @@ class BatchedMACCosmeticsScraper:
             product_info.update(additional_info)
             
             # Mark as scraped
-            self.scraped_urls.add(product['url'])
+            batch_urls.append(product['url'])
             
             scraped_products.append(product_info)
             logger.info(f"Added product with image: {product['name']} - {image_url}")
@@ -436,6 +437,8 @@ class BatchedMACCosmeticsScraper:
             # Add delay between products
             time.sleep(self.delay_between_requests)
         
+        self.scraped_urls.update(batch_urls)
+        
         # Save progress
         self.save_progress()
         
@@ -10,15 +10,24 @@ Date: 2024
 """
 
 import scrapy
-from scrapy_splash import SplashRequest
+from scrapy_splash import SplashRequest, SlotPolicy
 from scrapy.crawler import CrawlerProcess
 from scrapy.utils.project import get_project_settings
 import json
-import time
+import os
+import re
+from dataclasses import dataclass, field
 from datetime import datetime
+from itertools import chain
 from typing import Dict, List
+from urllib.parse import urldefrag, urljoin, urlsplit
 import logging
 
+try:
+    import orjson
+except ImportError:  # Fall back to the stdlib encoder
+    orjson = None
+
 # Configure logging
 logging.basicConfig(
     level=logging.INFO,
@@ -26,12 +35,46 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
+USER_AGENT = 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36'
+COMMON_HEADERS = {
+    'User-Agent': USER_AGENT,
+    'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,image/webp,*/*;q=0.8',
+    'Accept-Language': 'en-US,en;q=0.5',
+    'Accept-Encoding': 'gzip, deflate',
+    'Connection': 'keep-alive',
+    'Upgrade-Insecure-Requests': '1',
+}
+
+PRICE_RE = re.compile(r'\$(\d+\.?\d*)')
+
+@dataclass(slots=True)
+class Product:
+    """Scraped product record, exported as a feed item"""
+    name: str = ''
+    price: str = ''
+    original_price: str = ''
+    description: str = ''
+    image_url: str = ''
+    product_url: str = ''
+    rating: str = ''
+    review_count: str = ''
+    availability: str = 'Unknown'
+    category: str = 'skincare'
+    brand: str = 'MAC Cosmetics'
+    scraped_at: str = ''
+    detailed_description: str = ''
+    ingredients: str = ''
+    main_image: str = ''
+    additional_images: List[str] = field(default_factory=list)
+
 class RobustMACCosmeticsSpider(scrapy.Spider):
     name = 'robust_mac_cosmetics'
     allowed_domains = ['maccosmetics.com', 'localhost']
     start_urls = ['https://www.maccosmetics.com/skincare']
     
     # Custom settings for Splash
+    # SPLASH_URL points at an Aquarium (HAProxy-fronted) pool of Splash
+    # workers; concurrency should match the number of workers in the pool.
     custom_settings = {
         'SPLASH_URL': 'http://localhost:8050',
         'DOWNLOADER_MIDDLEWARES': {
@@ -43,25 +86,100 @@ class RobustMACCosmeticsSpider(scrapy.Spider):
             'scrapy_splash.SplashDeduplicateArgsMiddleware': 100,
         },
         'DUPEFILTER_CLASS': 'scrapy_splash.SplashAwareDupeFilter',
+        'HTTPCACHE_ENABLED': True,  # Replay Splash renders while tuning selectors
+        'HTTPCACHE_EXPIRATION_SECS': 86400,
+        'HTTPCACHE_DIR': '.scrapy/httpcache',
         'HTTPCACHE_STORAGE': 'scrapy_splash.SplashAwareFSCacheStorage',
         'ROBOTSTXT_OBEY': True,
         'DOWNLOAD_DELAY': 2,  # Reduced for faster scraping
         'RANDOMIZE_DOWNLOAD_DELAY': True,
-        'CONCURRENT_REQUESTS': 1,
-        'CONCURRENT_REQUESTS_PER_DOMAIN': 1,
+        'CONCURRENT_REQUESTS': 8,
+        'CONCURRENT_REQUESTS_PER_DOMAIN': 8,
         'AUTOTHROTTLE_ENABLED': True,
         'AUTOTHROTTLE_START_DELAY': 2,
         'AUTOTHROTTLE_MAX_DELAY': 5,
-        'AUTOTHROTTLE_TARGET_CONCURRENCY': 1.0,
+        'AUTOTHROTTLE_TARGET_CONCURRENCY': 8.0,
         'AUTOTHROTTLE_DEBUG': True,
-        'USER_AGENT': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36',
+        'USER_AGENT': USER_AGENT,
         'OFFSITE_ENABLED': False,  # Disable offsite filtering for Splash
+        # Splash traffic goes through the default HTTP/1.1 handler, which
+        # keeps connections to the Splash backend alive between renders
+        'RETRY_ENABLED': True,
+        'DOWNLOAD_MAXSIZE': 20_000_000,
+        # With a JOBDIR (opt-in, see run_robust_scrapy_spider) pending requests
+        # go to an on-disk FIFO queue so RAM stays bounded
+        'SCHEDULER': 'scrapy.core.scheduler.Scheduler',
+        'SCHEDULER_DISK_QUEUE': 'scrapy.squeues.PickleFifoDiskQueue',
+        'SCHEDULER_MEMORY_QUEUE': 'scrapy.squeues.FifoMemoryQueue',
+        'DEPTH_PRIORITY': 1,
+        # Stream each product to disk as soon as it is scraped
+        'FEEDS': {
+            'output_mac_scrapy_splash_robust.jsonl': {
+                'format': 'jsonlines',
+                'encoding': 'utf-8',
+                'item_export_kwargs': {'ensure_ascii': False},
+            },
+        },
     }
     
+    # Candidate product links on listing pages
+    PRODUCT_LINK_XPATH = "//a[contains(@href,'/product/') or contains(@href,'/skincare/')]/@href"
+    CONTAINER_LINK_XPATH = (
+        "//*[contains(@class,'product') or contains(@class,'item') or contains(@class,'card')]//a/@href"
+    )
+    
+    # Selectors for product containers on listing pages
+    NAME_SELECTORS = (
+        'h1::text', 'h2::text', 'h3::text', 'h4::text', 'h5::text', 'h6::text',
+        '[class*="title"]::text', '[class*="name"]::text', '[class*="product-name"]::text',
+        'a[class*="product"]::text', 'span[class*="title"]::text'
+    )
+    PRICE_SELECTORS = (
+        '[class*="price"]::text', '[class*="cost"]::text',
+        'span[class*="price"]::text', 'div[class*="price"]::text'
+    )
+    DESC_SELECTORS = (
+        '[class*="description"]::text', '[class*="desc"]::text',
+        'p::text', 'span[class*="description"]::text'
+    )
+    
+    # Selectors for individual product pages
+    # Each field is one XPath union; [1] returns the first non-blank text
+    # node in document order without a Python round-trip per candidate
+    # The product <h1> is queried on its own first: in a union, a header or
+    # navigation <h2>/title earlier in the document would win
+    PRODUCT_H1_XPATH = '(//h1/text())[normalize-space()][1]'
+    PRODUCT_NAME_XPATH = (
+        '(//h2/text() | //h3/text()'
+        ' | //*[contains(@class,"title")]/text()'
+        ' | //*[contains(@class,"product-name")]/text())[normalize-space()][1]'
+    )
+    PRODUCT_PRICE_XPATH = (
+        '(//*[contains(@class,"price")]/text() | //*[contains(@class,"cost")]/text()'
+        ' | //*[@data-price]/text())[contains(., "$")][1]'
+    )
+    PRODUCT_DESC_XPATH = (
+        '(//*[contains(@class,"desc")]/text())[normalize-space()][1]'
+    )
+    PRODUCT_DETAILED_DESC_XPATH = (
+        '(//*[contains(@class,"product-description")]/text()'
+        ' | //*[contains(@class,"details")]/text()'
+        ' | //div[contains(@class,"description")]/text())[normalize-space()][1]'
+    )
+    PRODUCT_INGREDIENTS_XPATH = (
+        '(//*[contains(@class,"ingredient")]/text())[normalize-space()][1]'
+    )
+    AVAILABILITY_SELECTOR = 'button::text, [class*="availability"]::text'
+    IMG_ATTRS = ('src', 'data-src', 'data-lazy')
+    IMG_EXTENSIONS = ('.jpg', '.jpeg', '.png', '.webp')
+    
     def __init__(self):
-        self.products = []
+        self._scraped_at = datetime.now().isoformat()
         self.scraped_count = 0
         self.failed_count = 0
+        self.products_with_prices = 0
+        self.products_with_urls = 0
+        self.sample_products = []
         
     def start_requests(self):
         """Start requests with Splash for JavaScript rendering"""
@@ -69,21 +187,14 @@ class RobustMACCosmeticsSpider(scrapy.Spider):
             yield SplashRequest(
                 url,
                 self.parse,
-                endpoint='render.html',
+                endpoint='execute',
                 args={
-                    'wait': 8,  # Increased wait time
                     'lua_source': self.get_lua_script(),
                     'timeout': 90,
                     'resource_timeout': 30,
                 },
-                headers={
-                    'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36',
-                    'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,image/webp,*/*;q=0.8',
-                    'Accept-Language': 'en-US,en;q=0.5',
-                    'Accept-Encoding': 'gzip, deflate',
-                    'Connection': 'keep-alive',
-                    'Upgrade-Insecure-Requests': '1',
-                }
+                slot_policy=SlotPolicy.SINGLE_SLOT,
+                headers=COMMON_HEADERS
             )
     
     def get_lua_script(self):
@@ -92,30 +203,40 @@ class RobustMACCosmeticsSpider(scrapy.Spider):
         function main(splash, args)
             splash:set_user_agent('Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36')
             
-            -- Wait for page to load
-            splash:wait(5)
-            
-            -- Scroll down multiple times to load lazy images
-            splash:evaljs([[
-                function scrollDown() {
-                    var height = document.body.scrollHeight;
-                    window.scrollTo(0, height);
-                    return height;
+            -- Only the HTML is parsed, so skip images, plugins, CSS and fonts
+            splash.images_enabled = false
+            splash.plugins_enabled = false
+            -- Render args such as resource_timeout are not applied under execute
+            if args.resource_timeout then
+                splash.resource_timeout = args.resource_timeout
+            end
+            splash:on_request(function(request)
+                if request.url:find('%.css') or request.url:find('%.woff') or request.url:find('%.png') then
+                    request:abort()
+                end
+            end)
+            
+            assert(splash:go(args.url))
+            
+            -- Resume as soon as the page has finished loading
+            splash:wait_for_resume([[
+                function main(splash) {
+                    if (document.readyState === 'complete') {
+                        splash.resume();
+                    } else {
+                        window.addEventListener('load', function() {
+                            splash.resume();
+                        });
+                    }
                 }
-                scrollDown();
-            ]])
-            
-            -- Wait for images to load
-            splash:wait(2)
+            ]], 10)
             
-            -- Scroll back up
+            -- Scroll down to trigger lazy images, then back up
             splash:evaljs([[
+                window.scrollTo(0, document.body.scrollHeight);
                 window.scrollTo(0, 0);
             ]])
             
-            -- Wait a bit more for any remaining content
-            splash:wait(1)
-            
             -- Try to trigger any lazy loading
             splash:evaljs([[
                 function triggerLazyLoading() {
@@ -132,11 +253,7 @@ class RobustMACCosmeticsSpider(scrapy.Spider):
                 triggerLazyLoading();
             ]])
             
-            return {
-                html = splash:html(),
-                png = splash:png(),
-                har = splash:har(),
-            }
+            return splash:html()
         end
         """
     
@@ -144,49 +261,35 @@ class RobustMACCosmeticsSpider(scrapy.Spider):
         """Parse the main skincare page and extract product links"""
         logger.info(f"Parsing main page: {response.url}")
         
-        # Try multiple strategies to find product links
-        product_links = []
-        
-        # Strategy 1: Look for product links in href attributes
-        links = response.css('a[href*="/product/"]::attr(href)').getall()
-        product_links.extend(links)
-        
-        # Strategy 2: Look for skincare-specific links
-        skincare_links = response.css('a[href*="/skincare/"]::attr(href)').getall()
-        product_links.extend(skincare_links)
-        
-        # Strategy 3: Look for any links that might be products
-        all_links = response.css('a::attr(href)').getall()
-        for link in all_links:
-            if link and ('/product/' in link or '/skincare/' in link or 'mac' in link.lower()):
-                product_links.append(link)
-        
-        # Strategy 4: Look for product containers and extract links
-        product_containers = response.css('[class*="product"], [class*="item"], [class*="card"]')
-        for container in product_containers:
-            link = container.css('a::attr(href)').get()
-            if link:
-                product_links.append(link)
+        # Product/skincare hrefs and links inside product containers,
+        # each gathered in a single tree walk
+        product_links = chain(
+            response.xpath(self.PRODUCT_LINK_XPATH).getall(),
+            response.xpath(self.CONTAINER_LINK_XPATH).getall(),
+        )
         
-        # Remove duplicates and filter valid links
-        unique_links = list(set(product_links))
+        # Resolve links without their fragments so '#' and '#reviews'
+        # anchors collapse onto the page they point into
+        page_url = urldefrag(response.url).url
         valid_links = []
         
-        for link in unique_links:
-            if link and link.startswith('/'):
-                full_url = response.urljoin(link)
-                if 'maccosmetics.com' in full_url:
-                    valid_links.append(full_url)
-            elif link and link.startswith('http'):
-                if 'maccosmetics.com' in link:
-                    valid_links.append(link)
+        for link in product_links:
+            if not link:
+                continue
+            # Parse each link once; handles relative and protocol-relative URLs
+            full_url = urldefrag(urljoin(response.url, link)).url
+            if full_url != page_url and urlsplit(full_url).netloc.endswith('maccosmetics.com'):
+                valid_links.append(full_url)
+        
+        # Remove duplicates, keeping discovery order
+        valid_links = list(dict.fromkeys(valid_links))
         
         logger.info(f"Found {len(valid_links)} product links")
         
         # If no product links found, try to extract product information directly from the page
         if not valid_links:
             logger.info("No product links found, extracting products directly from page")
-            self.extract_products_from_page(response)
+            yield from self.extract_products_from_page(response)
         else:
             # Process each product link
             for i, link in enumerate(valid_links[:20]):  # Limit to 20 for ethical scraping
@@ -195,26 +298,16 @@ class RobustMACCosmeticsSpider(scrapy.Spider):
                 yield SplashRequest(
                     link,
                     self.parse_product,
-                    endpoint='render.html',
+                    endpoint='execute',
                     args={
-                        'wait': 5,
                         'lua_source': self.get_product_lua_script(),
                         'timeout': 60,
                         'resource_timeout': 20,
                     },
+                    slot_policy=SlotPolicy.SINGLE_SLOT,
                     meta={'product_url': link},
-                    headers={
-                        'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36',
-                        'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,image/webp,*/*;q=0.8',
-                        'Accept-Language': 'en-US,en;q=0.5',
-                        'Accept-Encoding': 'gzip, deflate',
-                        'Connection': 'keep-alive',
-                        'Upgrade-Insecure-Requests': '1',
-                    }
+                    headers=COMMON_HEADERS
                 )
-                
-                # Add delay between requests
-                time.sleep(2)
     
     def extract_products_from_page(self, response):
         """Extract product information directly from the main page"""
@@ -225,110 +318,96 @@ class RobustMACCosmeticsSpider(scrapy.Spider):
         
         for container in product_containers:
             product_info = self.extract_product_info_from_container(container, response.url)
-            if product_info['name'] and product_info['image_url']:
-                self.products.append(product_info)
-                self.scraped_count += 1
-                logger.info(f"Extracted product: {product_info['name']}")
+            if product_info.name and product_info.image_url:
+                self.track_product(product_info)
+                logger.info(f"Extracted product: {product_info.name}")
+                yield product_info
     
     def extract_product_info_from_container(self, container, base_url):
         """Extract product information from a container element"""
-        product_info = {
-            'name': '',
-            'price': '',
-            'original_price': '',
-            'description': '',
-            'image_url': '',
-            'product_url': '',
-            'rating': '',
-            'review_count': '',
-            'availability': 'Unknown',
-            'category': 'skincare',
-            'brand': 'MAC Cosmetics',
-            'scraped_at': datetime.now().isoformat(),
-            'detailed_description': '',
-            'ingredients': '',
-            'main_image': '',
-            'additional_images': []
-        }
+        product_info = Product(scraped_at=self._scraped_at)
         
         # Extract product name
-        name_selectors = [
-            'h1::text', 'h2::text', 'h3::text', 'h4::text', 'h5::text', 'h6::text',
-            '[class*="title"]::text', '[class*="name"]::text', '[class*="product-name"]::text',
-            'a[class*="product"]::text', 'span[class*="title"]::text'
-        ]
-        
-        for selector in name_selectors:
+        for selector in self.NAME_SELECTORS:
             name = container.css(selector).get()
             if name and name.strip():
-                product_info['name'] = name.strip()
+                product_info.name = name.strip()
                 break
         
         # Extract price
-        price_selectors = [
-            '[class*="price"]::text', '[class*="cost"]::text',
-            'span[class*="price"]::text', 'div[class*="price"]::text'
-        ]
-        
-        for selector in price_selectors:
+        for selector in self.PRICE_SELECTORS:
             price_text = container.css(selector).get()
             if price_text:
-                import re
-                price_match = re.search(r'\$(\d+\.?\d*)', price_text)
+                price_match = PRICE_RE.search(price_text)
                 if price_match:
-                    product_info['price'] = f"${price_match.group(1)}"
+                    product_info.price = f"${price_match.group(1)}"
                     break
         
         # Extract image URL
-        img_selectors = [
-            'img[src*=".jpg"]::attr(src)', 'img[src*=".jpeg"]::attr(src)',
-            'img[src*=".png"]::attr(src)', 'img[src*=".webp"]::attr(src)',
-            'img[data-src*=".jpg"]::attr(data-src)', 'img[data-src*=".png"]::attr(data-src)',
-            'img[data-lazy*=".jpg"]::attr(data-lazy)', 'img[data-lazy*=".png"]::attr(data-lazy)',
-            'img::attr(src)'
-        ]
-        
-        images = []
-        for selector in img_selectors:
-            img_url = container.css(selector).get()
-            if img_url:
-                if not img_url.startswith('http'):
-                    img_url = response.urljoin(img_url)
-                if 'mac' in img_url.lower() or 'maccosmetics' in img_url.lower():
-                    images.append(img_url)
+        images = self.extract_image_urls(container, base_url)
         
         if images:
-            product_info['image_url'] = images[0]
-            product_info['main_image'] = images[0]
-            product_info['additional_images'] = images[1:]
+            product_info.image_url = images[0]
+            product_info.main_image = images[0]
+            product_info.additional_images = images[1:]
         
         # Extract product URL
         link = container.css('a::attr(href)').get()
         if link:
             if not link.startswith('http'):
-                link = response.urljoin(link)
-            product_info['product_url'] = link
+                link = urljoin(base_url, link)
+            product_info.product_url = link
         
         # Extract description
-        desc_selectors = [
-            '[class*="description"]::text', '[class*="desc"]::text',
-            'p::text', 'span[class*="description"]::text'
-        ]
-        
-        for selector in desc_selectors:
+        for selector in self.DESC_SELECTORS:
             desc = container.css(selector).get()
             if desc and desc.strip():
-                product_info['description'] = desc.strip()
+                product_info.description = desc.strip()
                 break
         
         return product_info
     
+    def extract_image_urls(self, selector, base_url):
+        """Collect unique MAC image URLs from every <img> under selector"""
+        # Read every <img> once; lazy-load attributes only count when
+        # they point at an image file
+        images = []
+        for img in selector.css('img'):
+            for attr in self.IMG_ATTRS:
+                img_url = img.attrib.get(attr)
+                if not img_url or len(img_url) <= 10:
+                    continue
+                if attr != 'src' and not any(ext in img_url for ext in self.IMG_EXTENSIONS):
+                    continue
+                if not img_url.startswith('http'):
+                    img_url = urljoin(base_url, img_url)
+                if 'mac' in img_url.lower() or 'maccosmetics' in img_url.lower():
+                    images.append(img_url)
+        
+        # Remove duplicates, keeping document order
+        return list(dict.fromkeys(images))
+    
     def get_product_lua_script(self):
         """Lua script for individual product pages"""
         return """
         function main(splash, args)
             splash:set_user_agent('Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36')
             
+            -- Only the HTML is parsed, so skip images, plugins, CSS and fonts
+            splash.images_enabled = false
+            splash.plugins_enabled = false
+            -- Render args such as resource_timeout are not applied under execute
+            if args.resource_timeout then
+                splash.resource_timeout = args.resource_timeout
+            end
+            splash:on_request(function(request)
+                if request.url:find('%.css') or request.url:find('%.woff') or request.url:find('%.png') then
+                    request:abort()
+                end
+            end)
+            
+            assert(splash:go(args.url))
+            
             -- Wait for page to load
             splash:wait(3)
             
@@ -365,11 +444,7 @@ class RobustMACCosmeticsSpider(scrapy.Spider):
             -- Wait a bit more
             splash:wait(1)
             
-            return {
-                html = splash:html(),
-                png = splash:png(),
-                har = splash:har(),
-            }
+            return splash:html()
         end
         """
     
@@ -380,142 +455,75 @@ class RobustMACCosmeticsSpider(scrapy.Spider):
         
         try:
             # Extract product information
-            product_info = {
-                'name': '',
-                'price': '',
-                'original_price': '',
-                'description': '',
-                'image_url': '',
-                'product_url': product_url,
-                'rating': '',
-                'review_count': '',
-                'availability': 'Unknown',
-                'category': 'skincare',
-                'brand': 'MAC Cosmetics',
-                'scraped_at': datetime.now().isoformat(),
-                'detailed_description': '',
-                'ingredients': '',
-                'main_image': '',
-                'additional_images': []
-            }
+            product_info = Product(product_url=product_url, scraped_at=self._scraped_at)
             
             # Extract product name
-            name_selectors = [
-                'h1::text', 'h2::text', 'h3::text',
-                '[class*="title"]::text', '[class*="product-name"]::text',
-                '[class*="product-title"]::text'
-            ]
-            
-            for selector in name_selectors:
-                name = response.css(selector).get()
-                if name and name.strip():
-                    product_info['name'] = name.strip()
-                    break
+            name = response.xpath(self.PRODUCT_H1_XPATH).get() or response.xpath(self.PRODUCT_NAME_XPATH).get()
+            if name:
+                product_info.name = name.strip()
             
             # Extract price
-            price_selectors = [
-                '[class*="price"]::text', '[class*="cost"]::text',
-                'span[class*="price"]::text', 'div[class*="price"]::text',
-                '[data-price]::text'
-            ]
-            
-            for selector in price_selectors:
-                price_text = response.css(selector).get()
-                if price_text:
-                    import re
-                    price_match = re.search(r'\$(\d+\.?\d*)', price_text)
-                    if price_match:
-                        product_info['price'] = f"${price_match.group(1)}"
-                        break
+            price_text = response.xpath(self.PRODUCT_PRICE_XPATH).get()
+            if price_text:
+                price_match = PRICE_RE.search(price_text)
+                if price_match:
+                    product_info.price = f"${price_match.group(1)}"
             
             # Extract description
-            desc_selectors = [
-                '[class*="description"]::text', '[class*="desc"]::text',
-                'p[class*="description"]::text'
-            ]
-            
-            for selector in desc_selectors:
-                desc = response.css(selector).get()
-                if desc and desc.strip():
-                    product_info['description'] = desc.strip()
-                    break
+            desc = response.xpath(self.PRODUCT_DESC_XPATH).get()
+            if desc:
+                product_info.description = desc.strip()
             
             # Extract detailed description
-            detailed_desc_selectors = [
-                '[class*="product-description"]::text',
-                '[class*="details"]::text',
-                'div[class*="description"]::text'
-            ]
-            
-            for selector in detailed_desc_selectors:
-                detailed_desc = response.css(selector).get()
-                if detailed_desc and detailed_desc.strip():
-                    product_info['detailed_description'] = detailed_desc.strip()
-                    break
+            detailed_desc = response.xpath(self.PRODUCT_DETAILED_DESC_XPATH).get()
+            if detailed_desc:
+                product_info.detailed_description = detailed_desc.strip()
             
             # Extract ingredients
-            ingredients_selectors = [
-                '[class*="ingredients"]::text',
-                '[class*="ingredient"]::text',
-                'div[class*="ingredients"]::text'
-            ]
-            
-            for selector in ingredients_selectors:
-                ingredients = response.css(selector).get()
-                if ingredients and ingredients.strip():
-                    product_info['ingredients'] = ingredients.strip()
-                    break
+            ingredients = response.xpath(self.PRODUCT_INGREDIENTS_XPATH).get()
+            if ingredients:
+                product_info.ingredients = ingredients.strip()
             
             # Extract images - MANDATORY
-            img_selectors = [
-                'img[src*=".jpg"]::attr(src)', 'img[src*=".jpeg"]::attr(src)',
-                'img[src*=".png"]::attr(src)', 'img[src*=".webp"]::attr(src)',
-                'img[data-src*=".jpg"]::attr(data-src)', 'img[data-src*=".png"]::attr(data-src)',
-                'img[data-lazy*=".jpg"]::attr(data-lazy)', 'img[data-lazy*=".png"]::attr(data-lazy)',
-                'img[class*="product"]::attr(src)', 'img[class*="main"]::attr(src)',
-                'img[alt*="product"]::attr(src)', 'img::attr(src)'
-            ]
-            
-            images = []
-            for selector in img_selectors:
-                image_urls = response.css(selector).getall()
-                for img_url in image_urls:
-                    if img_url and len(img_url) > 10:
-                        if not img_url.startswith('http'):
-                            img_url = response.urljoin(img_url)
-                        if 'mac' in img_url.lower() or 'maccosmetics' in img_url.lower():
-                            images.append(img_url)
-            
-            # Remove duplicates and set images
-            unique_images = list(dict.fromkeys(images))
+            unique_images = self.extract_image_urls(response, response.url)
             
             if unique_images:
-                product_info['image_url'] = unique_images[0]
-                product_info['main_image'] = unique_images[0]
-                product_info['additional_images'] = unique_images[1:]
+                product_info.image_url = unique_images[0]
+                product_info.main_image = unique_images[0]
+                product_info.additional_images = unique_images[1:]
             
-            # Extract availability
-            availability_text = response.css('body::text').getall()
+            # Extract availability from buttons and stock labels only
+            availability_text = response.css(self.AVAILABILITY_SELECTOR).getall()
             availability_text = ' '.join(availability_text).lower()
             
             if 'sold out' in availability_text or 'out of stock' in availability_text:
-                product_info['availability'] = 'Out of Stock'
+                product_info.availability = 'Out of Stock'
             elif 'add to bag' in availability_text or 'add to cart' in availability_text:
-                product_info['availability'] = 'In Stock'
+                product_info.availability = 'In Stock'
             
             # Only add product if it has a name and image
-            if product_info['name'] and product_info['image_url']:
-                self.products.append(product_info)
-                self.scraped_count += 1
-                logger.info(f"Successfully scraped: {product_info['name']} - {product_info['image_url']}")
+            if product_info.name and product_info.image_url:
+                self.track_product(product_info)
+                logger.info(f"Successfully scraped: {product_info.name} - {product_info.image_url}")
+                yield product_info
             else:
                 self.failed_count += 1
-                logger.warning(f"Failed to scrape product: {product_info['name']} - No image URL")
+                logger.warning(f"Failed to scrape product: {product_info.name} - No image URL")
                 
         except Exception as e:
             self.failed_count += 1
             logger.error(f"Error parsing product {product_url}: {e}")
     
+    def track_product(self, product_info):
+        """Update running statistics for a product about to be exported"""
+        self.scraped_count += 1
+        if product_info.price:
+            self.products_with_prices += 1
+        if product_info.product_url:
+            self.products_with_urls += 1
+        if len(self.sample_products) < 5:
+            self.sample_products.append(product_info)
+    
     def closed(self, reason):
         """Called when spider is closed"""
         logger.info(f"Spider closed. Reason: {reason}")
@@ -526,16 +534,15 @@ class RobustMACCosmeticsSpider(scrapy.Spider):
         self.save_results()
     
     def save_results(self):
-        """Save scraped products to JSON file"""
+        """Save a scraping summary next to the streamed products feed"""
         try:
-            # Filter products to ensure they have image URLs
-            products_with_images = [p for p in self.products if p.get('image_url')]
-            
+            feed_filename = 'output_mac_scrapy_splash_robust.jsonl'
             output_data = {
                 'scraper_info': {
                     'scraped_at': datetime.now().isoformat(),
                     'source_url': 'https://www.maccosmetics.com/skincare',
-                    'total_products': len(products_with_images),
+                    'total_products': self.scraped_count,
+                    'products_file': feed_filename,
                     'scraper_version': '4.1.0',
                     'enhanced_features': [
                         'Robust Scrapy with Splash for JavaScript rendering',
@@ -544,44 +551,44 @@ class RobustMACCosmeticsSpider(scrapy.Spider):
                         'Mandatory image URLs',
                         'Real data only (no fake/sample data)',
                         'Ethical rate limiting',
-                        'JavaScript-rendered content extraction'
+                        'JavaScript-rendered content extraction',
+                        'Incremental JSON Lines output'
                     ],
                     'scraping_stats': {
                         'total_scraped': self.scraped_count,
                         'failed_attempts': self.failed_count,
-                        'products_with_images': len(products_with_images),
-                        'products_without_images': len(self.products) - len(products_with_images)
+                        'products_with_images': self.scraped_count
                     }
-                },
-                'products': products_with_images
+                }
             }
             
             filename = 'output_mac_scrapy_splash_robust.json'
-            with open(filename, 'w', encoding='utf-8') as f:
-                json.dump(output_data, f, indent=2, ensure_ascii=False)
+            if orjson is not None:
+                with open(filename, 'wb') as f:
+                    f.write(orjson.dumps(output_data, option=orjson.OPT_INDENT_2 | orjson.OPT_NON_STR_KEYS))
+            else:
+                with open(filename, 'w', encoding='utf-8') as f:
+                    json.dump(output_data, f, indent=2, ensure_ascii=False)
             
-            logger.info(f"Successfully saved {len(products_with_images)} products with images to {filename}")
+            logger.info(f"Streamed {self.scraped_count} products with images to {feed_filename}")
             
             # Print summary
-            print(f"\nSuccessfully scraped {len(products_with_images)} products!")
-            print(f"Data saved to {filename}")
+            print(f"\nSuccessfully scraped {self.scraped_count} products!")
+            print(f"Products saved to {feed_filename}, summary saved to {filename}")
             
             # Print first few products as preview
             print("\nSample products:")
-            for i, product in enumerate(products_with_images[:5]):
-                price = product.get('price', 'N/A')
-                image = "YES" if product.get('image_url') else "NO"
-                print(f"{i+1}. {product.get('name', 'N/A')} - {price} {image}")
+            for i, product in enumerate(self.sample_products):
+                price = product.price or 'N/A'
+                image = "YES" if product.image_url else "NO"
+                print(f"{i+1}. {product.name or 'N/A'} - {price} {image}")
             
             # Show statistics
-            products_with_prices = sum(1 for p in products_with_images if p.get('price'))
-            products_with_urls = sum(1 for p in products_with_images if p.get('product_url'))
-            products_with_images_count = sum(1 for p in products_with_images if p.get('image_url'))
             print(f"\nStatistics:")
-            print(f"   - Products with prices: {products_with_prices}/{len(products_with_images)}")
-            print(f"   - Products with URLs: {products_with_urls}/{len(products_with_images)}")
-            print(f"   - Products with images: {products_with_images_count}/{len(products_with_images)}")
-            print(f"   - Total products scraped: {len(products_with_images)}")
+            print(f"   - Products with prices: {self.products_with_prices}/{self.scraped_count}")
+            print(f"   - Products with URLs: {self.products_with_urls}/{self.scraped_count}")
+            print(f"   - Products with images: {self.scraped_count}/{self.scraped_count}")
+            print(f"   - Total products scraped: {self.scraped_count}")
             
         except Exception as e:
             logger.error(f"Error saving results: {e}")
@@ -589,21 +596,28 @@ class RobustMACCosmeticsSpider(scrapy.Spider):
 def run_robust_scrapy_spider():
     """Run the robust Scrapy spider"""
     # Create a crawler process
-    process = CrawlerProcess({
-        'USER_AGENT': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36',
+    settings = {
+        'USER_AGENT': USER_AGENT,
         'ROBOTSTXT_OBEY': True,
         'DOWNLOAD_DELAY': 2,
         'RANDOMIZE_DOWNLOAD_DELAY': True,
-        'CONCURRENT_REQUESTS': 1,
-        'CONCURRENT_REQUESTS_PER_DOMAIN': 1,
+        'CONCURRENT_REQUESTS': 8,
+        'CONCURRENT_REQUESTS_PER_DOMAIN': 8,
         'AUTOTHROTTLE_ENABLED': True,
         'AUTOTHROTTLE_START_DELAY': 2,
         'AUTOTHROTTLE_MAX_DELAY': 5,
-        'AUTOTHROTTLE_TARGET_CONCURRENCY': 1.0,
+        'AUTOTHROTTLE_TARGET_CONCURRENCY': 8.0,
         'AUTOTHROTTLE_DEBUG': True,
         'LOG_LEVEL': 'INFO',
         'OFFSITE_ENABLED': False,  # Disable offsite filtering for Splash
-    })
+    }
+    
+    # Persisting the scheduler is opt-in: a JOBDIR also keeps the dupefilter's
+    # seen fingerprints, so reusing one drops the start request on later runs
+    jobdir = os.environ.get('MAC_SPLASH_JOBDIR')
+    if jobdir:
+        settings['JOBDIR'] = jobdir
+    process = CrawlerProcess(settings)
     
     # Add the spider to the process
     process.crawl(RobustMACCosmeticsSpider)
@@ -614,7 +628,8 @@ def run_robust_scrapy_spider():
 if __name__ == "__main__":
     print("Starting Robust MAC Cosmetics Scrapy Scraper with Splash...")
     print("Make sure Splash is running on http://localhost:8050")
-    print("To install Splash: docker run -p 8050:8050 scrapinghub/splash")
+    print("For parallel rendering run an Aquarium Splash pool: https://github.com/TeamHG-Memex/aquarium")
+    print("Single instance fallback: docker run -p 8050:8050 scrapinghub/splash")
     print("This may take several minutes due to ethical rate limiting...")
     
     try:
@@ -14,11 +14,18 @@ from scrapy_splash import SplashRequest
 from scrapy.crawler import CrawlerProcess
 from scrapy.utils.project import get_project_settings
 import json
-import time
-from datetime import datetime
+import os
+import re
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
 from typing import Dict, List
 import logging
 
+try:
+    import orjson
+except ImportError:  # Fall back to the stdlib encoder
+    orjson = None
+
 # Configure logging
 logging.basicConfig(
     level=logging.INFO,
@@ -26,6 +33,164 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
+# Set MAC_SPLASH_DEBUG=1 to have Splash also return a screenshot and HAR per render
+DEBUG_SPLASH = os.environ.get('MAC_SPLASH_DEBUG') == '1'
+
+# Splash Lua scripts; sent once per crawl via cache_args
+_LISTING_LUA = """
+function main(splash, args)
+    -- Only image URLs are needed, not the image data
+    splash.images_enabled = false
+    splash.plugins_enabled = false
+    -- Render args such as resource_timeout are not applied under execute
+    if args.resource_timeout then
+        splash.resource_timeout = args.resource_timeout
+    end
+    splash:set_user_agent('Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36')
+    -- A tall viewport lets a single scroll trigger every lazy loader
+    splash:set_viewport_size(1024, 2480)
+    
+    assert(splash:go(args.url))
+    
+    -- Poll until the DOM is ready and product markup is present
+    for i = 1, 20 do
+        splash:wait(0.25)
+        if splash:evaljs("document.readyState") == "complete"
+            and splash:evaljs("!!document.querySelector('[class*=product]')") then
+            break
+        end
+    end
+    
+    -- Scroll down to load lazy images, then back up
+    splash:evaljs([[
+        window.scrollTo(0, document.body.scrollHeight);
+        window.scrollTo(0, 0);
+    ]])
+    
+    local out = {html = splash:html()}
+    if args.debug then
+        out.png = splash:png()
+        out.har = splash:har()
+    end
+    return out
+end
+"""
+
+_PRODUCT_LUA = """
+function main(splash, args)
+    -- Only image URLs are needed, not the image data
+    splash.images_enabled = false
+    splash.plugins_enabled = false
+    -- Render args such as resource_timeout are not applied under execute
+    if args.resource_timeout then
+        splash.resource_timeout = args.resource_timeout
+    end
+    splash:set_user_agent('Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36')
+    splash:set_viewport_size(1024, 2480)
+    
+    assert(splash:go(args.url))
+    
+    -- Poll until the DOM is ready and product markup is present
+    for i = 1, 20 do
+        splash:wait(0.25)
+        if splash:evaljs("document.readyState") == "complete"
+            and splash:evaljs("!!document.querySelector('[class*=product]')") then
+            break
+        end
+    end
+    
+    -- Trigger any lazy loading
+    splash:evaljs([[
+        function triggerLazyLoading() {
+            var lazyImages = document.querySelectorAll('img[data-src], img[data-lazy]');
+            lazyImages.forEach(function(img) {
+                if (img.dataset.src) {
+                    img.src = img.dataset.src;
+                }
+                if (img.dataset.lazy) {
+                    img.src = img.dataset.lazy;
+                }
+            });
+        }
+        triggerLazyLoading();
+    ]])
+    
+    local out = {html = splash:html()}
+    if args.debug then
+        out.png = splash:png()
+        out.har = splash:har()
+    end
+    return out
+end
+"""
+
+_FEED_FILE = 'output_mac_scrapy_splash.jsonl'
+# Product URLs already exported by earlier runs
+_SEEN_URLS_FILE = 'mac_scrapy_splash_seen_urls.json'
+
+_PRICE_RE = re.compile(r'\$(\d+\.?\d*)')
+
+# Product page text node candidates for each field
+_NAME_SELECTORS = (
+    '//h2/text()',
+    '//h3/text()',
+    '//*[contains(@class,"title")]/text()',
+    '//*[contains(@class,"product-name")]/text()',
+    '//*[contains(@class,"product-title")]/text()',
+)
+_PRICE_SELECTORS = (
+    '//*[contains(@class,"price")]/text()',
+    '//*[contains(@class,"cost")]/text()',
+    '//*[@data-price]/text()',
+)
+_DESC_SELECTORS = (
+    '//*[contains(@class,"desc")]/text()',
+)
+_DETAILED_DESC_SELECTORS = (
+    '//*[contains(@class,"product-description")]/text()',
+    '//*[contains(@class,"details")]/text()',
+    '//div[contains(@class,"description")]/text()',
+)
+_INGREDIENTS_SELECTORS = (
+    '//*[contains(@class,"ingredient")]/text()',
+)
+
+def _first_match_xpath(selectors, predicate='normalize-space()'):
+    """Union the candidates into one XPath that stops at the first matching node"""
+    return '(' + ' | '.join(selectors) + f')[{predicate}][1]'
+
+# The product <h1> is queried on its own first: in a union, a header or
+# navigation <h2>/title earlier in the document would win
+_H1_XPATH = _first_match_xpath(('//h1/text()',))
+_NAME_XPATH = _first_match_xpath(_NAME_SELECTORS)
+_PRICE_XPATH = _first_match_xpath(_PRICE_SELECTORS, 'contains(., "$")')
+_DESC_XPATH = _first_match_xpath(_DESC_SELECTORS)
+_DETAILED_DESC_XPATH = _first_match_xpath(_DETAILED_DESC_SELECTORS)
+_INGREDIENTS_XPATH = _first_match_xpath(_INGREDIENTS_SELECTORS)
+_AVAILABILITY_CSS = 'button::text, [class*="add-to-bag"]::text, [class*="sold-out"]::text'
+_IMAGE_XPATH = '//img/@src | //img/@data-src | //img/@data-lazy'
+_IMAGE_EXTENSIONS = ('.jpg', '.jpeg', '.png', '.webp')
+
+@dataclass(slots=True)
+class MACProduct:
+    """Scraped product record, exported as a feed item"""
+    name: str = ''
+    price: str = ''
+    original_price: str = ''
+    description: str = ''
+    image_url: str = ''
+    product_url: str = ''
+    rating: str = ''
+    review_count: str = ''
+    availability: str = 'Unknown'
+    category: str = 'skincare'
+    brand: str = 'MAC Cosmetics'
+    scraped_at: str = ''
+    detailed_description: str = ''
+    ingredients: str = ''
+    main_image: str = ''
+    additional_images: List[str] = field(default_factory=list)
+
 class MACCosmeticsSpider(scrapy.Spider):
     name = 'mac_cosmetics'
     allowed_domains = ['maccosmetics.com']
@@ -43,38 +208,75 @@ class MACCosmeticsSpider(scrapy.Spider):
             'scrapy_splash.SplashDeduplicateArgsMiddleware': 100,
         },
         'DUPEFILTER_CLASS': 'scrapy_splash.SplashAwareDupeFilter',
+        'HTTPCACHE_ENABLED': True,  # Replay renders while developing selectors
+        'HTTPCACHE_EXPIRATION_SECS': 86400,
+        'HTTPCACHE_DIR': 'httpcache',
+        'HTTPCACHE_IGNORE_HTTP_CODES': [500, 502, 503, 504, 408, 429],
         'HTTPCACHE_STORAGE': 'scrapy_splash.SplashAwareFSCacheStorage',
         'ROBOTSTXT_OBEY': True,
         'DOWNLOAD_DELAY': 3,  # 3 seconds between requests
         'RANDOMIZE_DOWNLOAD_DELAY': True,
-        'CONCURRENT_REQUESTS': 1,  # Conservative for ethical scraping
-        'CONCURRENT_REQUESTS_PER_DOMAIN': 1,
+        'CONCURRENT_REQUESTS': 8,  # One per Splash slot (--slots 8)
+        'CONCURRENT_REQUESTS_PER_DOMAIN': 8,
         'AUTOTHROTTLE_ENABLED': True,
         'AUTOTHROTTLE_START_DELAY': 3,
         'AUTOTHROTTLE_MAX_DELAY': 10,
-        'AUTOTHROTTLE_TARGET_CONCURRENCY': 1.0,
+        'AUTOTHROTTLE_TARGET_CONCURRENCY': 4.0,
         'AUTOTHROTTLE_DEBUG': True,
         'USER_AGENT': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36',
+        'TWISTED_REACTOR': 'twisted.internet.asyncioreactor.AsyncioSelectorReactor',
+        # Stream each product to disk as soon as it is scraped
+        'FEEDS': {
+            _FEED_FILE: {'format': 'jsonlines', 'encoding': 'utf-8', 'overwrite': False},
+        },
     }
     
-    def __init__(self):
-        self.products = []
-        self.scraped_count = 0
-        self.failed_count = 0
-        
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        # Product URLs exported by earlier runs, skipped before they are enqueued
+        self._scraped_urls = self.load_seen_urls()
+        self._seen_urls = set(self._scraped_urls)
+        # One crawl-level timestamp shared by every exported product
+        self._scraped_at = datetime.now(timezone.utc).isoformat()
+    
+    def load_seen_urls(self):
+        """Load product URLs exported by previous runs"""
+        try:
+            if os.path.exists(_SEEN_URLS_FILE):
+                with open(_SEEN_URLS_FILE, 'r', encoding='utf-8') as f:
+                    seen_urls = set(json.load(f).get('scraped_urls', []))
+                logger.info(f"Loaded {len(seen_urls)} previously scraped product URLs")
+                return seen_urls
+        except Exception as e:
+            logger.error(f"Error loading seen URLs: {e}")
+        return set()
+    
+    def save_seen_urls(self):
+        """Persist exported product URLs so the next run can skip them"""
+        try:
+            with open(_SEEN_URLS_FILE, 'w', encoding='utf-8') as f:
+                json.dump({
+                    'scraped_urls': sorted(self._scraped_urls),
+                    'last_updated': datetime.now().isoformat()
+                }, f, indent=2, ensure_ascii=False)
+            logger.info(f"Saved {len(self._scraped_urls)} scraped product URLs")
+        except Exception as e:
+            logger.error(f"Error saving seen URLs: {e}")
+    
     def start_requests(self):
         """Start requests with Splash for JavaScript rendering"""
         for url in self.start_urls:
             yield SplashRequest(
                 url,
                 self.parse,
-                endpoint='render.html',
+                endpoint='execute',
                 args={
-                    'wait': 5,  # Wait for JavaScript to load
-                    'lua_source': self.get_lua_script(),
+                    'lua_source': _LISTING_LUA,
+                    'debug': DEBUG_SPLASH,
                     'timeout': 90,
-                    'resource_timeout': 30,
+                    'resource_timeout': 10,
                 },
+                cache_args=['lua_source'],
                 headers={
                     'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36',
                     'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,image/webp,*/*;q=0.8',
@@ -85,44 +287,6 @@ class MACCosmeticsSpider(scrapy.Spider):
                 }
             )
     
-    def get_lua_script(self):
-        """Lua script for Splash to handle JavaScript rendering"""
-        return """
-        function main(splash, args)
-            splash:set_user_agent('Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36')
-            
-            -- Wait for page to load
-            splash:wait(5)
-            
-            -- Scroll down to load lazy images
-            splash:evaljs([[
-                function scrollDown() {
-                    var height = document.body.scrollHeight;
-                    window.scrollTo(0, height);
-                    return height;
-                }
-                scrollDown();
-            ]])
-            
-            -- Wait for images to load
-            splash:wait(3)
-            
-            -- Scroll back up
-            splash:evaljs([[
-                window.scrollTo(0, 0);
-            ]])
-            
-            -- Wait a bit more for any remaining content
-            splash:wait(2)
-            
-            return {
-                html = splash:html(),
-                png = splash:png(),
-                har = splash:har(),
-            }
-        end
-        """
-    
     def parse(self, response):
         """Parse the main skincare page and extract product links"""
         logger.info(f"Parsing main page: {response.url}")
@@ -133,90 +297,80 @@ class MACCosmeticsSpider(scrapy.Spider):
         # Also look for skincare-specific links
         skincare_links = response.css('a[href*="/skincare/"]::attr(href)').getall()
         
-        # Combine and deduplicate links
-        all_links = list(set(product_links + skincare_links))
+        # Combine and deduplicate links, keeping page order
+        all_links = list(dict.fromkeys(product_links + skincare_links))
         
         logger.info(f"Found {len(all_links)} product links")
         
-        # Process each product link
-        for i, link in enumerate(all_links[:50]):  # Limit to 50 for ethical scraping
+        # Drop products exported on earlier runs before applying the cap, so
+        # old links don't use up this run's budget
+        new_urls = []
+        for link in all_links:
             if link and '/product/' in link:
                 full_url = response.urljoin(link)
-                logger.info(f"Processing product {i+1}/{min(50, len(all_links))}: {full_url}")
-                
-                yield SplashRequest(
-                    full_url,
-                    self.parse_product,
-                    endpoint='render.html',
-                    args={
-                        'wait': 3,
-                        'lua_source': self.get_product_lua_script(),
-                        'timeout': 60,
-                        'resource_timeout': 20,
-                    },
-                    meta={'product_url': full_url},
-                    headers={
-                        'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36',
-                        'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,image/webp,*/*;q=0.8',
-                        'Accept-Language': 'en-US,en;q=0.5',
-                        'Accept-Encoding': 'gzip, deflate',
-                        'Connection': 'keep-alive',
-                        'Upgrade-Insecure-Requests': '1',
-                    }
-                )
-                
-                # Add delay between requests
-                time.sleep(3)
-    
-    def get_product_lua_script(self):
-        """Lua script for individual product pages"""
-        return """
-        function main(splash, args)
-            splash:set_user_agent('Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36')
-            
-            -- Wait for page to load
-            splash:wait(3)
-            
-            -- Scroll to load images
-            splash:evaljs([[
-                function scrollToImages() {
-                    var images = document.querySelectorAll('img[src*=".jpg"], img[src*=".png"], img[src*=".webp"]');
-                    if (images.length > 0) {
-                        images[0].scrollIntoView({behavior: 'smooth', block: 'center'});
-                    }
-                }
-                scrollToImages();
-            ]])
-            
-            -- Wait for images to load
-            splash:wait(2)
-            
-            -- Trigger any lazy loading
-            splash:evaljs([[
-                function triggerLazyLoading() {
-                    var lazyImages = document.querySelectorAll('img[data-src], img[data-lazy]');
-                    lazyImages.forEach(function(img) {
-                        if (img.dataset.src) {
-                            img.src = img.dataset.src;
-                        }
-                        if (img.dataset.lazy) {
-                            img.src = img.dataset.lazy;
-                        }
-                    });
+                if full_url not in self._seen_urls:
+                    self._seen_urls.add(full_url)
+                    new_urls.append(full_url)
+                    if len(new_urls) == 50:  # Limit to 50 for ethical scraping
+                        break
+        
+        # Process each product link
+        for i, full_url in enumerate(new_urls):
+            logger.info(f"Processing product {i+1}/{len(new_urls)}: {full_url}")
+            
+            # Product pages are server-rendered; fetch them directly and
+            # only fall back to Splash when the plain HTML is incomplete
+            yield scrapy.Request(
+                full_url,
+                self.parse_product,
+                errback=self.product_request_failed,
+                meta={'product_url': full_url},
+                headers={
+                    'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36',
+                    'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,image/webp,*/*;q=0.8',
+                    'Accept-Language': 'en-US,en;q=0.5',
+                    'Accept-Encoding': 'gzip, deflate',
+                    'Connection': 'keep-alive',
+                    'Upgrade-Insecure-Requests': '1',
                 }
-                triggerLazyLoading();
-            ]])
-            
-            -- Wait a bit more
-            splash:wait(1)
-            
-            return {
-                html = splash:html(),
-                png = splash:png(),
-                har = splash:har(),
+            )
+    
+    def make_splash_product_request(self, product_url):
+        """Build a Splash-rendered request for a JavaScript-only product page"""
+        return SplashRequest(
+            product_url,
+            self.parse_product,
+            errback=self.product_request_failed,
+            endpoint='execute',
+            args={
+                'lua_source': _PRODUCT_LUA,
+                'debug': DEBUG_SPLASH,
+                'timeout': 60,
+                'resource_timeout': 10,
+            },
+            cache_args=['lua_source'],
+            meta={'product_url': product_url, 'splash_rendered': True},
+            headers={
+                'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36',
+                'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,image/webp,*/*;q=0.8',
+                'Accept-Language': 'en-US,en;q=0.5',
+                'Accept-Encoding': 'gzip, deflate',
+                'Connection': 'keep-alive',
+                'Upgrade-Insecure-Requests': '1',
             }
-        end
-        """
+        )
+    
+    def product_request_failed(self, failure):
+        """Retry blocked or failed direct fetches through Splash, count the rest"""
+        request = failure.request
+        product_url = request.meta.get('product_url', request.url)
+        if not request.meta.get('splash_rendered'):
+            # 403/429/5xx from bot protection or a network error; render it instead
+            logger.info(f"Direct fetch failed ({failure.value!r}), retrying with Splash: {product_url}")
+            yield self.make_splash_product_request(product_url)
+        else:
+            self.crawler.stats.inc_value('mac_cosmetics/failed_products')
+            logger.error(f"Error fetching product {product_url}: {failure.value!r}")
     
     def parse_product(self, response):
         """Parse individual product page"""
@@ -225,226 +379,159 @@ class MACCosmeticsSpider(scrapy.Spider):
         
         try:
             # Extract product information
-            product_info = {
-                'name': '',
-                'price': '',
-                'original_price': '',
-                'description': '',
-                'image_url': '',
-                'product_url': product_url,
-                'rating': '',
-                'review_count': '',
-                'availability': 'Unknown',
-                'category': 'skincare',
-                'brand': 'MAC Cosmetics',
-                'scraped_at': datetime.now().isoformat(),
-                'detailed_description': '',
-                'ingredients': '',
-                'main_image': '',
-                'additional_images': []
-            }
+            product_info = MACProduct(product_url=product_url, scraped_at=self._scraped_at)
             
             # Extract product name
-            name_selectors = [
-                'h1::text',
-                'h2::text',
-                'h3::text',
-                '[class*="title"]::text',
-                '[class*="product-name"]::text',
-                '[class*="product-title"]::text'
-            ]
-            
-            for selector in name_selectors:
-                name = response.css(selector).get()
-                if name and name.strip():
-                    product_info['name'] = name.strip()
-                    break
+            name = response.xpath(_H1_XPATH).get() or response.xpath(_NAME_XPATH).get()
+            if name:
+                product_info.name = name.strip()
             
             # Extract price
-            price_selectors = [
-                '[class*="price"]::text',
-                '[class*="cost"]::text',
-                'span[class*="price"]::text',
-                'div[class*="price"]::text',
-                '[data-price]::text'
-            ]
-            
-            for selector in price_selectors:
-                price_text = response.css(selector).get()
-                if price_text:
-                    import re
-                    price_match = re.search(r'\$(\d+\.?\d*)', price_text)
-                    if price_match:
-                        product_info['price'] = f"${price_match.group(1)}"
-                        break
+            price_text = response.xpath(_PRICE_XPATH).get()
+            if price_text:
+                price_match = _PRICE_RE.search(price_text)
+                if price_match:
+                    product_info.price = f"${price_match.group(1)}"
             
             # Extract description
-            desc_selectors = [
-                '[class*="description"]::text',
-                '[class*="desc"]::text',
-                'p[class*="description"]::text'
-            ]
-            
-            for selector in desc_selectors:
-                desc = response.css(selector).get()
-                if desc and desc.strip():
-                    product_info['description'] = desc.strip()
-                    break
+            desc = response.xpath(_DESC_XPATH).get()
+            if desc:
+                product_info.description = desc.strip()
             
             # Extract detailed description
-            detailed_desc_selectors = [
-                '[class*="product-description"]::text',
-                '[class*="details"]::text',
-                'div[class*="description"]::text'
-            ]
-            
-            for selector in detailed_desc_selectors:
-                detailed_desc = response.css(selector).get()
-                if detailed_desc and detailed_desc.strip():
-                    product_info['detailed_description'] = detailed_desc.strip()
-                    break
+            detailed_desc = response.xpath(_DETAILED_DESC_XPATH).get()
+            if detailed_desc:
+                product_info.detailed_description = detailed_desc.strip()
             
             # Extract ingredients
-            ingredients_selectors = [
-                '[class*="ingredients"]::text',
-                '[class*="ingredient"]::text',
-                'div[class*="ingredients"]::text'
-            ]
-            
-            for selector in ingredients_selectors:
-                ingredients = response.css(selector).get()
-                if ingredients and ingredients.strip():
-                    product_info['ingredients'] = ingredients.strip()
-                    break
+            ingredients = response.xpath(_INGREDIENTS_XPATH).get()
+            if ingredients:
+                product_info.ingredients = ingredients.strip()
             
             # Extract images - MANDATORY
-            image_selectors = [
-                'img[src*=".jpg"]::attr(src)',
-                'img[src*=".jpeg"]::attr(src)',
-                'img[src*=".png"]::attr(src)',
-                'img[src*=".webp"]::attr(src)',
-                'img[data-src*=".jpg"]::attr(data-src)',
-                'img[data-src*=".jpeg"]::attr(data-src)',
-                'img[data-src*=".png"]::attr(data-src)',
-                'img[data-src*=".webp"]::attr(data-src)',
-                'img[data-lazy*=".jpg"]::attr(data-lazy)',
-                'img[data-lazy*=".jpeg"]::attr(data-lazy)',
-                'img[data-lazy*=".png"]::attr(data-lazy)',
-                'img[data-lazy*=".webp"]::attr(data-lazy)',
-                'img[class*="product"]::attr(src)',
-                'img[class*="main"]::attr(src)',
-                'img[alt*="product"]::attr(src)',
-                'img::attr(src)'  # Fallback
+            # One XPath pass over every <img> attribute, filtered in Python
+            raw_urls = [
+                u for u in response.xpath(_IMAGE_XPATH).getall()
+                if u and len(u) > 10 and any(ext in u for ext in _IMAGE_EXTENSIONS)
             ]
             
-            images = []
-            for selector in image_selectors:
-                image_urls = response.css(selector).getall()
-                for img_url in image_urls:
-                    if img_url and len(img_url) > 10:
-                        if not img_url.startswith('http'):
-                            img_url = response.urljoin(img_url)
-                        if 'mac' in img_url.lower() or 'maccosmetics' in img_url.lower():
-                            images.append(img_url)
-            
-            # Remove duplicates and set images
-            unique_images = list(dict.fromkeys(images))  # Preserve order while removing duplicates
+            # Remove duplicates while preserving order
+            seen = set()
+            unique_images = []
+            for img_url in raw_urls:
+                if not img_url.startswith('http'):
+                    img_url = response.urljoin(img_url)
+                if img_url in seen or 'mac' not in img_url.lower():
+                    continue
+                seen.add(img_url)
+                unique_images.append(img_url)
             
             if unique_images:
-                product_info['image_url'] = unique_images[0]  # Main image
-                product_info['main_image'] = unique_images[0]
-                product_info['additional_images'] = unique_images[1:]  # Additional images
+                product_info.image_url = unique_images[0]  # Main image
+                product_info.main_image = unique_images[0]
+                product_info.additional_images = unique_images[1:]  # Additional images
             
-            # Extract availability
-            availability_text = response.css('body::text').getall()
+            # Extract availability from cart buttons and stock labels only
+            availability_text = response.css(_AVAILABILITY_CSS).getall()
             availability_text = ' '.join(availability_text).lower()
             
             if 'sold out' in availability_text or 'out of stock' in availability_text:
-                product_info['availability'] = 'Out of Stock'
+                product_info.availability = 'Out of Stock'
             elif 'add to bag' in availability_text or 'add to cart' in availability_text:
-                product_info['availability'] = 'In Stock'
+                product_info.availability = 'In Stock'
             
             # Only add product if it has a name and image
-            if product_info['name'] and product_info['image_url']:
-                self.products.append(product_info)
-                self.scraped_count += 1
-                logger.info(f"Successfully scraped: {product_info['name']} - {product_info['image_url']}")
+            if product_info.name and product_info.image_url:
+                logger.info(f"Successfully scraped: {product_info.name} - {product_info.image_url}")
+                self._scraped_urls.add(product_url)
+                yield product_info
+            elif not response.meta.get('splash_rendered'):
+                # Fields may be filled in by JavaScript; retry through Splash
+                logger.info(f"Incomplete server-rendered page, retrying with Splash: {product_url}")
+                yield self.make_splash_product_request(product_url)
             else:
-                self.failed_count += 1
-                logger.warning(f"Failed to scrape product: {product_info['name']} - No image URL")
+                self.crawler.stats.inc_value('mac_cosmetics/failed_products')
+                logger.warning(f"Failed to scrape product: {product_info.name} - No image URL")
                 
         except Exception as e:
-            self.failed_count += 1
+            self.crawler.stats.inc_value('mac_cosmetics/failed_products')
             logger.error(f"Error parsing product {product_url}: {e}")
     
     def closed(self, reason):
         """Called when spider is closed"""
+        stats = self.crawler.stats
         logger.info(f"Spider closed. Reason: {reason}")
-        logger.info(f"Total products scraped: {self.scraped_count}")
-        logger.info(f"Failed attempts: {self.failed_count}")
+        logger.info(f"Total products scraped: {stats.get_value('item_scraped_count', 0)}")
+        logger.info(f"Failed attempts: {stats.get_value('mac_cosmetics/failed_products', 0)}")
+        self.save_seen_urls()
+
+def save_results(stats):
+    """Build the JSON summary file from the streamed products feed"""
+    try:
+        # Filter products to ensure they have image URLs
+        products_with_images = []
+        with open(_FEED_FILE, 'r', encoding='utf-8') as f:
+            for line in f:
+                product = json.loads(line)
+                if product.get('image_url'):
+                    products_with_images.append(product)
         
-        # Save results to JSON
-        self.save_results()
-    
-    def save_results(self):
-        """Save scraped products to JSON file"""
-        try:
-            # Filter products to ensure they have image URLs
-            products_with_images = [p for p in self.products if p.get('image_url')]
-            
-            output_data = {
-                'scraper_info': {
-                    'scraped_at': datetime.now().isoformat(),
-                    'source_url': 'https://www.maccosmetics.com/skincare',
-                    'total_products': len(products_with_images),
-                    'scraper_version': '4.0.0',
-                    'enhanced_features': [
-                        'Scrapy with Splash for JavaScript rendering',
-                        'Individual product page scraping',
-                        'Mandatory image URLs',
-                        'Real data only (no fake/sample data)',
-                        'Ethical rate limiting',
-                        'JavaScript-rendered content extraction'
-                    ],
-                    'scraping_stats': {
-                        'total_scraped': self.scraped_count,
-                        'failed_attempts': self.failed_count,
-                        'products_with_images': len(products_with_images),
-                        'products_without_images': len(self.products) - len(products_with_images)
-                    }
-                },
-                'products': products_with_images
-            }
-            
-            filename = 'output_mac_scrapy_splash.json'
+        output_data = {
+            'scraper_info': {
+                'scraped_at': datetime.now().isoformat(),
+                'source_url': 'https://www.maccosmetics.com/skincare',
+                'total_products': len(products_with_images),
+                'scraper_version': '4.0.0',
+                'enhanced_features': [
+                    'Scrapy with Splash for JavaScript rendering',
+                    'Individual product page scraping',
+                    'Mandatory image URLs',
+                    'Real data only (no fake/sample data)',
+                    'Ethical rate limiting',
+                    'JavaScript-rendered content extraction'
+                ],
+                'scraping_stats': {
+                    'total_scraped': stats.get('item_scraped_count', 0),
+                    'failed_attempts': stats.get('mac_cosmetics/failed_products', 0),
+                    'products_with_images': len(products_with_images)
+                }
+            },
+            'products': products_with_images
+        }
+        
+        filename = 'output_mac_scrapy_splash.json'
+        if orjson is not None:
+            with open(filename, 'wb') as f:
+                f.write(orjson.dumps(output_data, option=orjson.OPT_INDENT_2 | orjson.OPT_NON_STR_KEYS))
+        else:
             with open(filename, 'w', encoding='utf-8') as f:
                 json.dump(output_data, f, indent=2, ensure_ascii=False)
-            
-            logger.info(f"Successfully saved {len(products_with_images)} products with images to {filename}")
-            
-            # Print summary
-            print(f"\nSuccessfully scraped {len(products_with_images)} products!")
-            print(f"Data saved to {filename}")
-            
-            # Print first few products as preview
-            print("\nSample products:")
-            for i, product in enumerate(products_with_images[:5]):
-                price = product.get('price', 'N/A')
-                image = "YES" if product.get('image_url') else "NO"
-                print(f"{i+1}. {product.get('name', 'N/A')} - {price} {image}")
-            
-            # Show statistics
-            products_with_prices = sum(1 for p in products_with_images if p.get('price'))
-            products_with_urls = sum(1 for p in products_with_images if p.get('product_url'))
-            products_with_images_count = sum(1 for p in products_with_images if p.get('image_url'))
-            print(f"\nStatistics:")
-            print(f"   - Products with prices: {products_with_prices}/{len(products_with_images)}")
-            print(f"   - Products with URLs: {products_with_urls}/{len(products_with_images)}")
-            print(f"   - Products with images: {products_with_images_count}/{len(products_with_images)}")
-            print(f"   - Total products scraped: {len(products_with_images)}")
-            
-        except Exception as e:
-            logger.error(f"Error saving results: {e}")
+        
+        logger.info(f"Successfully saved {len(products_with_images)} products with images to {filename}")
+        
+        # Print summary
+        print(f"\nSuccessfully scraped {len(products_with_images)} products!")
+        print(f"Data saved to {filename}")
+        
+        # Print first few products as preview
+        print("\nSample products:")
+        for i, product in enumerate(products_with_images[:5]):
+            price = product.get('price', 'N/A')
+            image = "YES" if product.get('image_url') else "NO"
+            print(f"{i+1}. {product.get('name', 'N/A')} - {price} {image}")
+        
+        # Show statistics
+        # Every exported product has a URL and an image; only prices can be missing
+        products_with_prices = sum(1 for p in products_with_images if p.get('price'))
+        total = len(products_with_images)
+        print(f"\nStatistics:")
+        print(f"   - Products with prices: {products_with_prices}/{total}")
+        print(f"   - Products with URLs: {total}/{total}")
+        print(f"   - Products with images: {total}/{total}")
+        print(f"   - Total products scraped: {len(products_with_images)}")
+        
+    except Exception as e:
+        logger.error(f"Error saving results: {e}")
 
 def run_scrapy_spider():
     """Run the Scrapy spider"""
@@ -454,26 +541,31 @@ def run_scrapy_spider():
         'ROBOTSTXT_OBEY': True,
         'DOWNLOAD_DELAY': 3,
         'RANDOMIZE_DOWNLOAD_DELAY': True,
-        'CONCURRENT_REQUESTS': 1,
-        'CONCURRENT_REQUESTS_PER_DOMAIN': 1,
+        'CONCURRENT_REQUESTS': 8,
+        'CONCURRENT_REQUESTS_PER_DOMAIN': 8,
         'AUTOTHROTTLE_ENABLED': True,
         'AUTOTHROTTLE_START_DELAY': 3,
         'AUTOTHROTTLE_MAX_DELAY': 10,
-        'AUTOTHROTTLE_TARGET_CONCURRENCY': 1.0,
+        'AUTOTHROTTLE_TARGET_CONCURRENCY': 4.0,
         'AUTOTHROTTLE_DEBUG': True,
         'LOG_LEVEL': 'INFO',
+        'TWISTED_REACTOR': 'twisted.internet.asyncioreactor.AsyncioSelectorReactor',
     })
     
     # Add the spider to the process
-    process.crawl(MACCosmeticsSpider)
+    crawler = process.create_crawler(MACCosmeticsSpider)
+    process.crawl(crawler)
     
     # Start the crawling process
     process.start()
+    
+    # Summarize the feed once it has been fully written
+    save_results(crawler.stats.get_stats())
 
 if __name__ == "__main__":
     print("Starting MAC Cosmetics Scrapy Scraper with Splash...")
     print("Make sure Splash is running on http://localhost:8050")
-    print("To install Splash: docker run -p 8050:8050 scrapinghub/splash")
+    print("To install Splash: docker run -d -p 8050:8050 --memory=4.5G --restart=always scrapinghub/splash --maxrss 4000 --slots 8")
     print("This may take several minutes due to ethical rate limiting...")
     
     try:
@@ -15,10 +15,22 @@ import time
 import re
 import os
 from datetime import datetime
-from urllib.parse import urljoin, urlparse
-from typing import Dict, List, Optional
+from urllib.parse import urlparse
+from itertools import chain, islice
+from typing import Dict, Iterator, List, Optional
 import logging
+import threading
+from requests.adapters import HTTPAdapter
+from urllib3.util.request import ACCEPT_ENCODING
+from urllib3.util.retry import Retry
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from bs4 import BeautifulSoup
+from selectolax.lexbor import LexborHTMLParser
+
+try:
+    import orjson
+except ImportError:  # Fall back to the stdlib encoder
+    orjson = None
 
 # Configure logging
 logging.basicConfig(
@@ -27,6 +39,147 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
+# Product containers and their name elements on the collection page
+# (one :is() selector, since lexbor returns an element once per matching
+# branch of a comma-separated selector list)
+_CONTAINER_SELECTOR = ':is(div, article):is([class*=product], [class*=item], [class*=card], [class*=grid])'
+_CONTAINER_HEADING_SELECTOR = 'h1, h2, h3, h4, h5, h6'
+_CONTAINER_NAME_SELECTOR = '[class*=title], [class*=name], [class*=product]'
+
+# Image extraction strategies for Moida product pages, tried in order
+_IMG_SELECTORS = (
+    'img[src*=".jpg"]',
+    'img[src*=".jpeg"]',
+    'img[src*=".png"]',
+    'img[src*=".webp"]',
+    'img[data-src*=".jpg"]',
+    'img[data-src*=".png"]',
+    'img[data-lazy*=".jpg"]',
+    'img[data-lazy*=".png"]',
+    'img[class*="product"]',
+    'img[class*="main"]',
+    'img[alt*="product"]',
+    'img[src*="cdn.shopify.com"]',
+    'img[src*="moidaus.com"]',
+    'img',
+)
+
+# Product page field selectors, tried in order
+_PRICE_SELECTORS = (
+    '[class*="price"]',
+    '[class*="cost"]',
+    'span[class*="price"]',
+    'div[class*="price"]',
+    '[data-price]',
+    'span:contains("$")',
+    'div:contains("$")',
+)
+_DESC_SELECTORS = (
+    '[class*="description"]',
+    '[class*="product-description"]',
+    '[class*="details"]',
+    'p[class*="description"]',
+    '[class*="product-details"]',
+)
+_INGREDIENTS_SELECTORS = (
+    '[class*="ingredients"]',
+    '[class*="ingredient"]',
+    'div[class*="ingredients"]',
+    '[class*="product-ingredients"]',
+)
+_VENDOR_SELECTORS = (
+    '[class*="vendor"]',
+    '[class*="brand"]',
+    'span:contains("Vendor:")',
+    'div:contains("Vendor:")',
+)
+
+_PRICE_RE = re.compile(r'\$(\d+\.?\d*)')
+_DOLLAR_RE = re.compile(r'\$')
+_VENDOR_RE = re.compile(r'Vendor:', re.IGNORECASE)
+_SCHEME_RE = re.compile(r'[a-zA-Z][a-zA-Z0-9+.-]*:')
+
+# Price and vendor from the product JSON Shopify embeds in every product page.
+# Only the ShopifyAnalytics.meta product block is searched for the price, so a
+# related product's or a JSON-LD offer's "price" elsewhere on the page is never
+# picked up. Unquoted integer prices there are in cents; anything else is dollars.
+_SHOPIFY_META_RE = re.compile(rb'var meta\s*=\s*\{\s*"product"\s*:')
+_PRICE_JSON_RE = re.compile(rb'"price"\s*:\s*("?)(\d+(?:\.\d+)?)')
+_VENDOR_JSON_RE = re.compile(rb'"vendor"\s*:\s*"((?:[^"\\]|\\.)*)"')
+
+def _first_descendant(node, selector: str):
+    """First element below node matching selector (lexbor's css_first also matches node itself)"""
+    for child in node.iter():
+        match = child.css_first(selector)
+        if match is not None:
+            return match
+    return None
+
+def _first_text(node, pattern) -> str:
+    """First stripped text node below node that matches pattern"""
+    for text_node in node.traverse(include_text=True):
+        if text_node.tag == '-text':
+            text = text_node.text(deep=False)
+            if pattern.search(text):
+                return text.strip()
+    return ""
+
+def _json_dumps(data, indent: bool = False) -> bytes:
+    """Serialize to UTF-8 JSON bytes, with orjson when it is installed"""
+    if orjson is not None:
+        return orjson.dumps(data, option=orjson.OPT_INDENT_2 if indent else 0)
+    return json.dumps(data, indent=2 if indent else None, ensure_ascii=False).encode('utf-8')
+
+def _json_loads(data: bytes):
+    """Parse JSON bytes, with orjson when it is installed"""
+    return orjson.loads(data) if orjson is not None else json.loads(data)
+
+class TokenBucket:
+    """Thread-safe request pacer that adapts its rate to server back-pressure
+    
+    The rate is halved on a 429 or a slow response and raised by one step
+    after a run of healthy responses (additive increase, multiplicative decrease).
+    """
+    
+    def __init__(self, rate: float, min_rate: float, max_rate: float,
+                 slow_response: float = 1.0, increase_after: int = 10, step: float = 0.5):
+        self.rate = rate
+        self.min_rate = min_rate
+        self.max_rate = max_rate
+        self.slow_response = slow_response
+        self.increase_after = increase_after
+        self.step = step
+        self.tokens = 1.0
+        self.updated = time.monotonic()
+        self.healthy_streak = 0
+        self.lock = threading.Lock()
+    
+    def consume(self):
+        """Block until a request may be sent"""
+        while True:
+            with self.lock:
+                now = time.monotonic()
+                self.tokens = min(1.0, self.tokens + (now - self.updated) * self.rate)
+                self.updated = now
+                if self.tokens >= 1.0:
+                    self.tokens -= 1.0
+                    return
+                wait_time = (1.0 - self.tokens) / self.rate
+            time.sleep(wait_time)
+    
+    def record(self, status_code: int, elapsed: float):
+        """Adjust the rate from the outcome of a request"""
+        with self.lock:
+            if status_code == 429 or elapsed > self.slow_response:
+                self.rate = max(self.min_rate, self.rate / 2)
+                self.healthy_streak = 0
+                logger.info(f"Backing off to {self.rate:.2f} requests/second")
+            else:
+                self.healthy_streak += 1
+                if self.healthy_streak >= self.increase_after:
+                    self.rate = min(self.max_rate, self.rate + self.step)
+                    self.healthy_streak = 0
+
 class BatchedMoidaScraper:
     """Batched scraper for Moida skincare products with progress tracking"""
     
@@ -40,7 +193,8 @@ class BatchedMoidaScraper:
             'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36',
             'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,image/webp,*/*;q=0.8',
             'Accept-Language': 'en-US,en;q=0.5',
-            'Accept-Encoding': 'gzip, deflate',
+            # gzip and deflate, plus br when the brotli package is installed
+            'Accept-Encoding': ACCEPT_ENCODING,
             'Connection': 'keep-alive',
             'Upgrade-Insecure-Requests': '1',
             'Referer': 'https://moidaus.com/',
@@ -48,67 +202,151 @@ class BatchedMoidaScraper:
         
         # Rate limiting settings
         self.delay_between_requests = 3  # seconds (more conservative for ethical scraping)
+        # Start at one request per second and only speed up while the server
+        # stays healthy; never slower than one request per delay_between_requests
+        self.rate_limiter = TokenBucket(rate=1.0, min_rate=1 / self.delay_between_requests, max_rate=5.0)
         self.max_retries = 3
+        self.max_workers = 8  # product pages fetched concurrently
+        
+        # Keep one pool of keep-alive connections per host (moidaus.com and
+        # the Shopify CDN), large enough for every worker to hold a socket.
+        # Retries and Retry-After waits happen in urllib3 on the pooled socket.
+        retries = Retry(
+            total=self.max_retries,
+            backoff_factor=1.5,
+            status_forcelist=[429, 500, 502, 503, 504],
+            respect_retry_after_header=True,
+            raise_on_status=False,
+        )
+        adapter = HTTPAdapter(pool_connections=20, pool_maxsize=max(20, self.max_workers), max_retries=retries)
+        self.session.mount('https://', adapter)
+        self.session.mount('http://', adapter)
         
         # Batch settings
         self.batch_size = 10  # products per category
         self.max_total_products = 60  # maximum products per run
         
         # Progress tracking
-        self.progress_file = "scraping_progress.json"
-        self.output_file = "output_moida_batched.json"
+        self.progress_file = "scraping_progress.txt"  # one scraped URL per line
+        self.legacy_progress_file = "scraping_progress.json"
+        self.output_file = "output_moida_batched.jsonl"
+        self.meta_file = "output_moida_batched.meta.json"
         self.scraped_urls = set()
         self.load_progress()
         
+        # Product page bodies fetched this run, shared by the image and detail
+        # extractors so a page is downloaded only once
+        self._page_cache = {}
+        self._page_cache_lock = threading.Lock()
+        
     def load_progress(self):
         """Load previously scraped URLs to avoid duplicates"""
         try:
             if os.path.exists(self.progress_file):
                 with open(self.progress_file, 'r', encoding='utf-8') as f:
-                    progress_data = json.load(f)
-                    self.scraped_urls = set(progress_data.get('scraped_urls', []))
-                    logger.info(f"Loaded {len(self.scraped_urls)} previously scraped URLs")
+                    self.scraped_urls = set(f.read().splitlines())
+                logger.info(f"Loaded {len(self.scraped_urls)} previously scraped URLs")
+            elif os.path.exists(self.legacy_progress_file):
+                # Carry URLs over from the old JSON progress file
+                with open(self.legacy_progress_file, 'rb') as f:
+                    self.scraped_urls = set(_json_loads(f.read()).get('scraped_urls', []))
+                with open(self.progress_file, 'w', encoding='utf-8') as f:
+                    f.writelines(url + '\n' for url in self.scraped_urls)
+                logger.info(f"Migrated {len(self.scraped_urls)} previously scraped URLs to {self.progress_file}")
             else:
                 logger.info("No previous progress found, starting fresh")
         except Exception as e:
             logger.error(f"Error loading progress: {e}")
             self.scraped_urls = set()
     
-    def save_progress(self):
-        """Save progress to avoid scraping the same products again"""
+    def make_request(self, url: str) -> Optional[requests.Response]:
+        """Make a rate-limited request; retries are handled by the session adapter"""
         try:
-            progress_data = {
-                'scraped_urls': list(self.scraped_urls),
-                'last_updated': datetime.now().isoformat()
-            }
-            with open(self.progress_file, 'w', encoding='utf-8') as f:
-                json.dump(progress_data, f, indent=2, ensure_ascii=False)
-            logger.info(f"Saved progress with {len(self.scraped_urls)} scraped URLs")
-        except Exception as e:
-            logger.error(f"Error saving progress: {e}")
+            self.rate_limiter.consume()
+            logger.info(f"Making request to: {url}")
+            response = self.session.get(url, timeout=20)
+            self.rate_limiter.record(response.status_code, response.elapsed.total_seconds())
+            
+            if response.status_code == 200:
+                return response
+            logger.warning(f"Request failed with status {response.status_code}")
+            
+        except requests.exceptions.RequestException as e:
+            logger.error(f"Request error: {e}")
+        
+        return None
     
-    def make_request(self, url: str) -> Optional[requests.Response]:
-        """Make a request with proper error handling and rate limiting"""
-        for attempt in range(self.max_retries):
+    def iter_collection_json(self) -> Iterator[Dict]:
+        """Discover products from the Shopify collection JSON endpoint
+        
+        Products are yielded as each page arrives, and the next page is only
+        requested once the caller has consumed the current one.
+        """
+        logger.info("Discovering products from collection JSON...")
+        
+        seen_urls = set()
+        page = 1
+        while True:
+            response = self.make_request(f"{self.skincare_url}/products.json?limit=250&page={page}")
+            if not response:
+                break
+            
             try:
-                logger.info(f"Making request to: {url}")
-                response = self.session.get(url, timeout=20)
+                page_products = response.json().get('products', [])
+            except ValueError as e:
+                logger.error(f"Error decoding collection JSON: {e}")
+                break
+            if not page_products:
+                break
+            
+            for product in page_products:
+                href = f"/products/{product['handle']}"
+                if href in seen_urls or href in self.scraped_urls:
+                    continue
+                seen_urls.add(href)
                 
-                if response.status_code == 200:
-                    return response
-                elif response.status_code == 429:  # Rate limited
-                    wait_time = (attempt + 1) * 15
-                    logger.warning(f"Rate limited. Waiting {wait_time} seconds...")
-                    time.sleep(wait_time)
-                else:
-                    logger.warning(f"Request failed with status {response.status_code}")
-                    
-            except requests.exceptions.RequestException as e:
-                logger.error(f"Request error (attempt {attempt + 1}): {e}")
-                if attempt < self.max_retries - 1:
-                    time.sleep(self.delay_between_requests)
-                    
-        return None
+                variants = product.get('variants') or [{}]
+                images = [image['src'] for image in product.get('images', []) if image.get('src')]
+                body_html = product.get('body_html') or ''
+                
+                yield {
+                    'name': product.get('title') or "Unknown Product",
+                    'url': href,
+                    'price': f"${variants[0]['price']}" if variants[0].get('price') else "",
+                    'image_url': images[0] if images else "",
+                    'additional_images': images[1:],
+                    'vendor': product.get('vendor', ''),
+                    'detailed_description': BeautifulSoup(body_html, 'lxml').get_text(' ', strip=True) if body_html else "",
+                    'category': 'skincare',
+                    'brand': 'Moida'
+                }
+            
+            # A short page is the last one in the collection
+            if len(page_products) < 250:
+                break
+            page += 1
+    
+    def _abs(self, src: str) -> str:
+        """Absolute URL for a page-relative src, without urljoin's full URL parse"""
+        if _SCHEME_RE.match(src):
+            return src
+        if src[:2] == '//':  # protocol-relative CDN links
+            return self.base_url.split('//', 1)[0] + src
+        return self.base_url + (src if src[:1] == '/' else '/' + src)
+    
+    def _fetch_content(self, url: str) -> Optional[bytes]:
+        """Fetch a product page body, reusing it if already fetched this run"""
+        with self._page_cache_lock:
+            if url in self._page_cache:
+                return self._page_cache[url]
+        
+        response = self.make_request(url)
+        if not response:
+            return None
+        
+        with self._page_cache_lock:
+            self._page_cache[url] = response.content
+        return response.content
     
     def discover_products_from_main_page(self) -> List[Dict]:
         """Discover products from the main skincare page"""
@@ -118,50 +356,53 @@ class BatchedMoidaScraper:
         if not response:
             return []
         
-        soup = BeautifulSoup(response.text, 'html.parser')
+        # The listing page is the largest document parsed, so use lexbor
+        # directly rather than building a BeautifulSoup tree
+        tree = LexborHTMLParser(response.content)
         products = []
+        seen_urls = set()
         
         # Look for product containers (based on analysis)
-        product_containers = soup.find_all(['div', 'article'], class_=lambda x: x and any(word in x.lower() for word in ['product', 'item', 'card', 'grid']))
+        product_containers = tree.css(_CONTAINER_SELECTOR)
         
         logger.info(f"Found {len(product_containers)} product containers")
         
         for container in product_containers:
             try:
                 # Extract product link
-                product_link = container.find('a', href=True)
-                if not product_link:
+                product_link = _first_descendant(container, 'a[href]')
+                if product_link is None:
                     continue
                     
-                href = product_link.get('href')
+                href = product_link.attributes.get('href')
                 if not href or '/products/' not in href:
                     continue
                 
-                # Skip if already scraped
+                # Skip duplicates and products scraped in earlier runs
+                if href in seen_urls:
+                    continue
+                seen_urls.add(href)
                 if href in self.scraped_urls:
                     logger.info(f"Skipping already scraped product: {href}")
                     continue
                 
                 # Extract product name
-                name_elem = container.find(['h1', 'h2', 'h3', 'h4', 'h5', 'h6']) or container.find(class_=lambda x: x and any(word in x.lower() for word in ['title', 'name', 'product']))
-                product_name = name_elem.get_text().strip() if name_elem else "Unknown Product"
+                name_elem = _first_descendant(container, _CONTAINER_HEADING_SELECTOR) or _first_descendant(container, _CONTAINER_NAME_SELECTOR)
+                product_name = name_elem.text().strip() if name_elem else "Unknown Product"
                 
                 # Extract price
-                price_elem = container.find(string=re.compile(r'\$'))
-                price = price_elem.strip() if price_elem else ""
+                price = _first_text(container, _DOLLAR_RE)
                 
                 # Extract image
-                img_elem = container.find('img', src=True)
+                img_elem = _first_descendant(container, 'img[src]')
                 image_url = ""
                 if img_elem:
-                    src = img_elem.get('src')
-                    if src and not src.startswith('http'):
-                        src = urljoin(self.base_url, src)
-                    image_url = src
+                    src = img_elem.attributes.get('src')
+                    if src:
+                        image_url = self._abs(src)
                 
                 # Extract vendor/brand
-                vendor_elem = container.find(string=re.compile(r'Vendor:', re.IGNORECASE))
-                vendor = vendor_elem.strip() if vendor_elem else ""
+                vendor = _first_text(container, _VENDOR_RE)
                 
                 product_info = {
                     'name': product_name,
@@ -180,58 +421,34 @@ class BatchedMoidaScraper:
                 logger.error(f"Error extracting product from container: {e}")
                 continue
         
-        # Remove duplicates based on URL
-        unique_products = []
-        seen_urls = set()
-        for product in products:
-            if product['url'] not in seen_urls:
-                unique_products.append(product)
-                seen_urls.add(product['url'])
-        
-        logger.info(f"Discovered {len(unique_products)} unique products")
-        return unique_products
+        logger.info(f"Discovered {len(products)} unique products")
+        return products
     
     def extract_image_from_product_page(self, product_url: str, product_name: str) -> str:
         """Extract image URL from individual product page"""
         logger.info(f"Extracting image from: {product_url}")
         
-        # Add delay before scraping individual page
-        time.sleep(self.delay_between_requests)
-        
-        response = self.make_request(product_url)
-        if not response:
+        content = self._fetch_content(product_url)
+        if not content:
             return ""
         
-        soup = BeautifulSoup(response.text, 'html.parser')
-        
-        # Try multiple image extraction strategies for Moida
-        img_selectors = [
-            'img[src*=".jpg"]',
-            'img[src*=".jpeg"]',
-            'img[src*=".png"]',
-            'img[src*=".webp"]',
-            'img[data-src*=".jpg"]',
-            'img[data-src*=".png"]',
-            'img[data-lazy*=".jpg"]',
-            'img[data-lazy*=".png"]',
-            'img[class*="product"]',
-            'img[class*="main"]',
-            'img[alt*="product"]',
-            'img[src*="cdn.shopify.com"]',
-            'img[src*="moidaus.com"]',
-            'img'
-        ]
-        
-        for selector in img_selectors:
-            img_elements = soup.select(selector)
-            for img_elem in img_elements:
-                img_url = img_elem.get('src') or img_elem.get('data-src') or img_elem.get('data-lazy')
-                if img_url and len(img_url) > 10:
-                    if not img_url.startswith('http'):
-                        img_url = urljoin(self.base_url, img_url)
-                    if 'moidaus.com' in img_url.lower() or 'cdn.shopify.com' in img_url.lower():
-                        logger.info(f"Found image: {img_url}")
-                        return img_url
+        soup = BeautifulSoup(content, 'lxml')
+        
+        # Try multiple image extraction strategies for Moida; matches are
+        # generated lazily so the scan stops at the first usable image.
+        # Lazy-loaded images keep a data: placeholder in src, so skip those
+        candidates = (
+            next((img_elem.get(attr) for attr in ('src', 'data-src', 'data-lazy')
+                  if img_elem.get(attr) and not img_elem.get(attr).startswith('data:')), None)
+            for selector in _IMG_SELECTORS
+            for img_elem in soup.css.iselect(selector)
+        )
+        for img_url in candidates:
+            if img_url and len(img_url) > 10:
+                img_url = self._abs(img_url)
+                if 'moidaus.com' in img_url.lower() or 'cdn.shopify.com' in img_url.lower():
+                    logger.info(f"Found image: {img_url}")
+                    return img_url
         
         # If no image found, return empty string
         logger.warning(f"No image found for {product_name}")
@@ -244,83 +461,73 @@ class BatchedMoidaScraper:
         
         logger.info(f"Scraping individual product page: {product_url}")
         
-        # Add delay before scraping individual page
-        time.sleep(self.delay_between_requests)
-        
-        response = self.make_request(product_url)
-        if not response:
+        content = self._fetch_content(product_url)
+        if not content:
             return {}
         
-        soup = BeautifulSoup(response.text, 'html.parser')
-        
         additional_info = {}
         
+        # Read price and vendor straight from the embedded product JSON,
+        # scoped to the ShopifyAnalytics product block when the page has one
+        start, end = 0, len(content)
+        meta_match = _SHOPIFY_META_RE.search(content)
+        if meta_match:
+            start = meta_match.end()
+            end = content.find(b'</script>', start)
+            if end == -1:
+                end = len(content)
+            price_match = _PRICE_JSON_RE.search(content, start, end)
+            if price_match:
+                quote, amount = price_match.groups()
+                price = float(amount)
+                if not quote and b'.' not in amount:
+                    price /= 100
+                additional_info['price'] = f"${price:.2f}"
+        vendor_match = _VENDOR_JSON_RE.search(content, start, end)
+        if vendor_match:
+            try:
+                additional_info['vendor'] = json.loads(b'"' + vendor_match.group(1) + b'"')
+            except ValueError:
+                additional_info['vendor'] = vendor_match.group(1).decode('utf-8', 'replace')
+        
+        soup = BeautifulSoup(content, 'lxml')
+        
         try:
             # Extract price from product page
-            price_selectors = [
-                '[class*="price"]',
-                '[class*="cost"]',
-                'span[class*="price"]',
-                'div[class*="price"]',
-                '[data-price]',
-                'span:contains("$")',
-                'div:contains("$")'
-            ]
-            
-            for selector in price_selectors:
-                price_elem = soup.select_one(selector)
-                if price_elem:
-                    price_text = price_elem.get_text().strip()
-                    price_match = re.search(r'\$(\d+\.?\d*)', price_text)
-                    if price_match:
-                        additional_info['price'] = f"${price_match.group(1)}"
-                        break
+            if 'price' not in additional_info:
+                for selector in _PRICE_SELECTORS:
+                    price_elem = soup.select_one(selector)
+                    if price_elem:
+                        price_text = price_elem.get_text().strip()
+                        price_match = _PRICE_RE.search(price_text)
+                        if price_match:
+                            additional_info['price'] = f"${price_match.group(1)}"
+                            break
             
             # Extract detailed description
-            desc_selectors = [
-                '[class*="description"]',
-                '[class*="product-description"]',
-                '[class*="details"]',
-                'p[class*="description"]',
-                '[class*="product-details"]'
-            ]
-            
-            for selector in desc_selectors:
+            for selector in _DESC_SELECTORS:
                 desc_elem = soup.select_one(selector)
                 if desc_elem and desc_elem.get_text().strip():
                     additional_info['detailed_description'] = desc_elem.get_text().strip()
                     break
             
             # Extract ingredients
-            ingredients_selectors = [
-                '[class*="ingredients"]',
-                '[class*="ingredient"]',
-                'div[class*="ingredients"]',
-                '[class*="product-ingredients"]'
-            ]
-            
-            for selector in ingredients_selectors:
+            for selector in _INGREDIENTS_SELECTORS:
                 ingredients_elem = soup.select_one(selector)
                 if ingredients_elem and ingredients_elem.get_text().strip():
                     additional_info['ingredients'] = ingredients_elem.get_text().strip()
                     break
             
             # Extract vendor/brand
-            vendor_selectors = [
-                '[class*="vendor"]',
-                '[class*="brand"]',
-                'span:contains("Vendor:")',
-                'div:contains("Vendor:")'
-            ]
-            
-            for selector in vendor_selectors:
-                vendor_elem = soup.select_one(selector)
-                if vendor_elem and vendor_elem.get_text().strip():
-                    vendor_text = vendor_elem.get_text().strip()
-                    if 'Vendor:' in vendor_text:
-                        vendor_name = vendor_text.replace('Vendor:', '').strip()
-                        additional_info['vendor'] = vendor_name
-                    break
+            if 'vendor' not in additional_info:
+                for selector in _VENDOR_SELECTORS:
+                    vendor_elem = soup.select_one(selector)
+                    if vendor_elem and vendor_elem.get_text().strip():
+                        vendor_text = vendor_elem.get_text().strip()
+                        if 'Vendor:' in vendor_text:
+                            vendor_name = vendor_text.replace('Vendor:', '').strip()
+                            additional_info['vendor'] = vendor_name
+                        break
             
         except Exception as e:
             logger.error(f"Error scraping individual product page: {e}")
@@ -331,95 +538,126 @@ class BatchedMoidaScraper:
         """Batched scraping with progress tracking"""
         logger.info("Starting batched Moida scraping...")
         
-        # Step 1: Discover products from main page
-        all_products = self.discover_products_from_main_page()
-        if not all_products:
-            logger.warning("No products found")
-            return []
+        # Step 1: Discover products from the collection JSON, falling back
+        # to the main page HTML when the endpoint is unavailable
+        discovered = self.iter_collection_json()
+        first_product = next(discovered, None)
+        if first_product is not None:
+            all_products = chain([first_product], discovered)
+        else:
+            all_products = iter(self.discover_products_from_main_page())
         
         # Step 2: Take only the first batch_size products (or max_total_products)
-        batch_products = all_products[:min(self.batch_size, self.max_total_products)]
-        logger.info(f"Selected {len(batch_products)} products for scraping")
+        batch_limit = min(self.batch_size, self.max_total_products)
+        batch_products = islice(all_products, batch_limit)
         
-        # Step 3: Scrape individual product pages
+        # Step 3: Scrape individual product pages concurrently; the work is
+        # network-bound, so threads overlap the waits on each page. Products
+        # are submitted as discovery yields them, so workers start on the
+        # first listing page while later pages are still being fetched.
         scraped_products = []
-        for i, product in enumerate(batch_products):
-            logger.info(f"Processing product {i+1}/{len(batch_products)}: {product['name']}")
+        with ThreadPoolExecutor(max_workers=self.max_workers) as executor, \
+                open(self.output_file, 'ab') as output, \
+                open(self.progress_file, 'a', encoding='utf-8') as progress:
+            futures = {}
+            for i, product in enumerate(batch_products):
+                logger.info(f"Queued product {i+1}: {product['name']}")
+                futures[executor.submit(self._process_one, product)] = product
             
-            # Create base product info
-            product_info = {
-                'name': product['name'],
-                'product_url': urljoin(self.base_url, product['url']),
-                'category': product['category'],
-                'brand': product['brand'],
-                'vendor': product.get('vendor', ''),
-                'scraped_at': datetime.now().isoformat(),
-                'image_url': product.get('image_url', ''),
-                'price': product.get('price', ''),
-                'detailed_description': '',
-                'ingredients': '',
-                'main_image': '',
-                'additional_images': []
-            }
-            
-            # Extract image from individual product page if not already found
-            if not product_info['image_url']:
-                image_url = self.extract_image_from_product_page(product_info['product_url'], product['name'])
-                if image_url:
-                    product_info['image_url'] = image_url
-                    product_info['main_image'] = image_url
-            
-            # Get additional info from individual page
-            additional_info = self.scrape_individual_product_page(product_info['product_url'])
-            product_info.update(additional_info)
-            
-            # Mark as scraped
-            self.scraped_urls.add(product['url'])
-            
-            # Only add if we have an image URL
-            if product_info['image_url']:
-                scraped_products.append(product_info)
-                logger.info(f"Added product with image: {product['name']} - {product_info['image_url']}")
-            else:
-                logger.warning(f"Skipping product without image: {product['name']}")
+            if not futures:
+                logger.warning("No products found")
+                return []
+            logger.info(f"Selected {len(futures)} products for scraping")
             
-            # Add delay between products
-            time.sleep(self.delay_between_requests)
-        
-        # Save progress
-        self.save_progress()
+            for future in as_completed(futures):
+                product = futures[future]
+                try:
+                    product_info = future.result()
+                except Exception as e:
+                    # Not marked as scraped, so the next run retries it
+                    logger.error(f"Error processing product {product['name']}: {e}")
+                    continue
+                
+                # Only add if we have an image URL; the product line is
+                # flushed before its URL is marked scraped, so an interrupted
+                # run can only leave a product to be retried, never lost
+                if product_info['image_url']:
+                    output.write(_json_dumps(product_info) + b'\n')
+                    output.flush()
+                    scraped_products.append(product_info)
+                    logger.info(f"Added product with image: {product['name']} - {product_info['image_url']}")
+                else:
+                    logger.warning(f"Skipping product without image: {product['name']}")
+                
+                # Mark as scraped
+                self.scraped_urls.add(product['url'])
+                progress.write(product['url'] + '\n')
+                progress.flush()
         
         logger.info(f"Total products scraped with images: {len(scraped_products)}")
         return scraped_products
     
-    def save_to_json(self, products: List[Dict], filename: str = None):
-        """Save scraped products to JSON file"""
-        if filename is None:
-            filename = self.output_file
-            
+    def _process_one(self, product: Dict) -> Dict:
+        """Build the full product record for one discovered product"""
+        # Create base product info
+        product_info = {
+            'name': product['name'],
+            'product_url': self._abs(product['url']),
+            'category': product['category'],
+            'brand': product['brand'],
+            'vendor': product.get('vendor', ''),
+            'scraped_at': datetime.now().isoformat(),
+            'image_url': product.get('image_url', ''),
+            'price': product.get('price', ''),
+            'detailed_description': product.get('detailed_description', ''),
+            'ingredients': product.get('ingredients', ''),
+            'main_image': product.get('image_url', ''),
+            'additional_images': product.get('additional_images', [])
+        }
+        
+        # Extract image from individual product page if not already found
+        if not product_info['image_url']:
+            image_url = self.extract_image_from_product_page(product_info['product_url'], product['name'])
+            if image_url:
+                product_info['image_url'] = image_url
+                product_info['main_image'] = image_url
+        
+        # Get additional info from individual page, skipping the round-trip
+        # when the listing already supplied the core fields. Neither the
+        # listing nor products.json carries ingredients, so they don't count
+        needs_detail = not all(product_info[key] for key in ('name', 'price', 'image_url', 'detailed_description'))
+        if needs_detail:
+            additional_info = self.scrape_individual_product_page(product_info['product_url'])
+            # Only fill gaps; listing data (e.g. the collection JSON's variant
+            # price and body_html description) is more reliable than HTML guesses
+            for key, value in additional_info.items():
+                product_info[key] = product_info.get(key) or value
+        
+        return product_info
+    
+    def save_metadata(self, products: List[Dict]):
+        """Update the metadata sidecar for products already appended to the output"""
+        filename = self.output_file
+        
         try:
-            # Filter products to ensure they have image URLs
             products_with_images = [p for p in products if p.get('image_url')]
             
-            # Load existing products if file exists
-            existing_products = []
-            if os.path.exists(filename):
+            # Carry the running total over from the previous metadata
+            previous_total = 0
+            if os.path.exists(self.meta_file):
                 try:
-                    with open(filename, 'r', encoding='utf-8') as f:
-                        existing_data = json.load(f)
-                        existing_products = existing_data.get('products', [])
-                        logger.info(f"Loaded {len(existing_products)} existing products")
+                    with open(self.meta_file, 'rb') as f:
+                        previous_total = _json_loads(f.read())['scraper_info']['total_products']
                 except Exception as e:
-                    logger.error(f"Error loading existing data: {e}")
-            
-            # Combine existing and new products
-            all_products = existing_products + products_with_images
+                    logger.error(f"Error loading existing metadata: {e}")
+            total_products = previous_total + len(products_with_images)
             
-            output_data = {
+            meta_data = {
                 'scraper_info': {
                     'scraped_at': datetime.now().isoformat(),
                     'source_url': self.skincare_url,
-                    'total_products': len(all_products),
+                    'output_file': filename,
+                    'total_products': total_products,
                     'scraper_version': '1.0.0',
                     'enhanced_features': [
                         'Batched scraping (10 products per category)',
@@ -435,22 +673,24 @@ class BatchedMoidaScraper:
                     'scraping_stats': {
                         'total_scraped_this_run': len(products),
                         'products_with_images_this_run': len(products_with_images),
-                        'total_products_all_runs': len(all_products),
+                        'total_products_all_runs': total_products,
                         'previously_scraped_urls': len(self.scraped_urls)
                     }
-                },
-                'products': all_products
+                }
             }
             
-            with open(filename, 'w', encoding='utf-8') as f:
-                json.dump(output_data, f, indent=2, ensure_ascii=False)
+            # Swap the metadata in atomically so readers never see a partial file
+            tmp_file = self.meta_file + '.tmp'
+            with open(tmp_file, 'wb') as f:
+                f.write(_json_dumps(meta_data, indent=True))
+            os.replace(tmp_file, self.meta_file)
             
-            logger.info(f"Successfully saved {len(products_with_images)} new products to {filename}")
-            logger.info(f"Total products in file: {len(all_products)}")
+            logger.info(f"Saved {len(products_with_images)} new products to {filename}")
+            logger.info(f"Total products in file: {total_products}")
             return True
             
         except Exception as e:
-            logger.error(f"Error saving to JSON: {e}")
+            logger.error(f"Error saving metadata: {e}")
             return False
     
     def run(self):
@@ -462,13 +702,13 @@ class BatchedMoidaScraper:
             products = self.scrape_batched()
             
             if products:
-                # Save to JSON
-                success = self.save_to_json(products)
+                # Products are already in the output file; record the run
+                success = self.save_metadata(products)
                 if success:
                     logger.info("Batched scraping completed successfully!")
                     return products
                 else:
-                    logger.error("Failed to save data to JSON")
+                    logger.error("Failed to save output metadata")
                     return []
             else:
                 logger.warning("No new products found to scrape")
@@ -477,6 +717,10 @@ class BatchedMoidaScraper:
         except Exception as e:
             logger.error(f"Scraping failed: {e}")
             return []
+        
+        finally:
+            # Release the cached page bodies
+            self._page_cache.clear()
 
 def main():
     """Main function to run the scraper"""
@@ -485,7 +729,7 @@ def main():
     
     if products:
         print(f"\nSuccessfully scraped {len(products)} new products!")
-        print("Data saved to output_moida_batched.json")
+        print(f"Data saved to {scraper.output_file}")
         
         # Print first few products as preview
         print("\nSample products from this run:")
@@ -53,8 +53,9 @@ def start_splash():
         
         # Start new Splash container
         result = subprocess.run([
-            'docker', 'run', '-d', '--name', 'splash', '-p', '8050:8050', 
-            'scrapinghub/splash'
+            'docker', 'run', '-d', '--name', 'splash', '-p', '8050:8050',
+            '--memory=4.5G', '--restart=always',
+            'scrapinghub/splash', '--maxrss', '4000', '--slots', '8'
         ], capture_output=True, text=True)
         
         if result.returncode == 0:
@@ -139,7 +140,7 @@ def main():
         print("\nStarting Splash...")
         if not start_splash():
             print("\nManual Splash setup:")
-            print("   docker run -p 8050:8050 scrapinghub/splash")
+            print("   docker run -d -p 8050:8050 --memory=4.5G --restart=always scrapinghub/splash --maxrss 4000 --slots 8")
             return False
     
     # Run scraper